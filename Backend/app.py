@@ -3,9 +3,12 @@ from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from config import Config
 from models.user import mongo
+from models.indexes import init_indexes
+from models.rollup import DetectionRollup
 from routes.auth import auth_bp
-from routes.ml_routes import ml_bp
+from routes.ml_routes import ml_bp, preload_models
 from routes.dashboard import dashboard_bp
+from routes.detection_results import COLLECTIONS
 
 
 def create_app():
@@ -15,11 +18,21 @@ def create_app():
     CORS(app)
     JWTManager(app)
     mongo.init_app(app)
+    init_indexes(app)
 
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
     app.register_blueprint(ml_bp, url_prefix="/api/ml")
     app.register_blueprint(dashboard_bp, url_prefix="/api/dashboard")
 
+    if app.config["ML_PRELOAD_MODELS"]:
+        preload_models()
+
+    @app.cli.command("backfill-rollups")
+    def backfill_rollups():
+        """Rebuild the dashboard's daily rollups from the stored detections."""
+        count = DetectionRollup.rebuild(COLLECTIONS)
+        print(f"Rebuilt {count} daily rollup documents")
+
     return app
 
 
@@ -7,6 +7,10 @@ class Config:
     
     # MongoDB settings
     MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/auth_db')
+    # Create the indexes in models/indexes.py on startup
+    MONGO_ENSURE_INDEXES = os.getenv('MONGO_ENSURE_INDEXES', 'true').lower() == 'true'
+    # Server selection timeout for that step, so a down server cannot stall startup
+    MONGO_INDEX_TIMEOUT_MS = int(os.getenv('MONGO_INDEX_TIMEOUT_MS', '2000'))
     
     # JWT settings
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key-here')
@@ -14,4 +18,34 @@ class Config:
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     
     # CORS settings
-    CORS_HEADERS = 'Content-Type' 
\ No newline at end of file
+    CORS_HEADERS = 'Content-Type'
+    
+    # Dashboard usage chart window in days (overridable with ?days=)
+    DASHBOARD_USAGE_DAYS = 7
+    DASHBOARD_MAX_USAGE_DAYS = 366
+    # In-process LRU cache for dashboard numbers, TTL in seconds (0 disables it)
+    DASHBOARD_CACHE_SIZE = int(os.getenv('DASHBOARD_CACHE_SIZE', '1024'))
+    DASHBOARD_CACHE_TTL = float(os.getenv('DASHBOARD_CACHE_TTL', '30'))
+    
+    # Admin user list pagination (GET /api/auth/userList)
+    USER_LIST_PAGE_SIZE = 100
+    USER_LIST_MAX_PAGE_SIZE = 1000
+    
+    # Detections stored per insert_many call
+    DETECTION_INSERT_BATCH_SIZE = int(os.getenv('DETECTION_INSERT_BATCH_SIZE', '1000'))
+    
+    # Load every ML model in create_app instead of on first request. Enable it
+    # with gunicorn --preload so forked workers share one copy of the models
+    ML_PRELOAD_MODELS = os.getenv('ML_PRELOAD_MODELS', 'false').lower() == 'true'
+    
+    # Rows parsed at a time from synchronous /api/ml/process uploads
+    ML_PROCESS_CHUNKSIZE = int(os.getenv('ML_PROCESS_CHUNKSIZE', '10000'))
+    
+    # Background detection jobs (POST /api/ml/process?mode=job)
+    ML_JOB_WORKERS = int(os.getenv('ML_JOB_WORKERS', '2'))
+    ML_JOB_CHUNKSIZE = int(os.getenv('ML_JOB_CHUNKSIZE', '10000'))
+    ML_JOB_PAGE_SIZE = 100
+    ML_JOB_MAX_PAGE_SIZE = 1000
+    # Jobs and their row results are deleted by a TTL index this long after
+    # their last update
+    ML_JOB_TTL = timedelta(days=int(os.getenv('ML_JOB_TTL_DAYS', '7')))
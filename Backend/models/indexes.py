@@ -0,0 +1,117 @@
+import logging
+from pymongo import ASCENDING, MongoClient
+from pymongo.errors import ConnectionFailure
+
+logger = logging.getLogger(__name__)
+
+DETECTION_COLLECTIONS = ['phishing_detections', 'sqli_detections', 'ddos_detections']
+
+# (collection, keys, options) for every index the backend relies on
+INDEXES = [
+    ('users', [('email', ASCENDING)], {'unique': True}),
+    ('users', [('username', ASCENDING)], {'unique': True}),
+    *[
+        (collection, [('user_id', ASCENDING), ('created_at', ASCENDING)], {})
+        for collection in DETECTION_COLLECTIONS
+    ],
+    (
+        'detection_daily_rollups',
+        [('user_id', ASCENDING), ('day', ASCENDING), ('attack_type', ASCENDING)],
+        {'unique': True},
+    ),
+    ('ml_job_results', [('job_id', ASCENDING), ('seq', ASCENDING)], {}),
+]
+
+
+def job_ttl_indexes(ttl):
+    """TTL indexes deleting background jobs and their results after `ttl`."""
+    seconds = int(ttl.total_seconds())
+    return [
+        ('ml_jobs', [('updated_at', ASCENDING)], {'expireAfterSeconds': seconds}),
+        ('ml_job_results', [('created_at', ASCENDING)], {'expireAfterSeconds': seconds}),
+    ]
+
+
+def ensure_indexes(db, job_ttl):
+    """Create any missing index. create_index is a no-op for existing ones.
+
+    A failing index (e.g. a unique index over duplicate values) is logged and
+    the remaining ones are still created. Returns the number of failures.
+    """
+    failures = 0
+    for collection, keys, options in INDEXES + job_ttl_indexes(job_ttl):
+        try:
+            db[collection].create_index(keys, **options)
+        except ConnectionFailure:
+            # Every other index would wait for the same server timeout
+            raise
+        except Exception as e:
+            failures += 1
+            logger.error(f"Error creating index {keys} on {collection}: {str(e)}")
+    return failures
+
+
+def init_indexes(app):
+    """Bootstrap indexes from create_app.
+
+    Uses its own client with a short server selection timeout, so an
+    unreachable MongoDB delays startup by at most MONGO_INDEX_TIMEOUT_MS
+    before the error is logged.
+    """
+    if not app.config['MONGO_ENSURE_INDEXES']:
+        return
+    client = MongoClient(
+        app.config['MONGO_URI'],
+        serverSelectionTimeoutMS=app.config['MONGO_INDEX_TIMEOUT_MS']
+    )
+    try:
+        ensure_indexes(client.get_default_database(), app.config['ML_JOB_TTL'])
+    except Exception as e:
+        logger.error(f"Error creating MongoDB indexes: {str(e)}")
+    finally:
+        client.close()
+
+
+def winning_stages(plan):
+    """Flatten a winningPlan into its stage names, outermost first."""
+    stages = [plan['stage']]
+    while 'inputStage' in plan:
+        plan = plan['inputStage']
+        stages.append(plan['stage'])
+    return stages
+
+
+def main():
+    import sys
+    from pathlib import Path
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from config import Config
+
+    client = MongoClient(Config.MONGO_URI)
+    db = client.get_default_database()
+    ensure_indexes(db, Config.ML_JOB_TTL)
+
+    # (collection, filter, sort) shaped like the queries the routes run
+    queries = [
+        ('users', {'email': 'user@example.com'}, None),
+        ('users', {'username': 'user'}, None),
+        *[
+            (collection, {'user_id': 'user-id'}, [('created_at', ASCENDING)])
+            for collection in DETECTION_COLLECTIONS
+        ],
+        ('ml_job_results', {'job_id': 'job-id'}, [('seq', ASCENDING)]),
+    ]
+    for collection, query, sort in queries:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = cursor.explain()
+        stages = winning_stages(explain['queryPlanner']['winningPlan'])
+        status = 'ok' if 'IXSCAN' in stages else 'COLLSCAN'
+        print(f"{collection} {query}: {' <- '.join(stages)} [{status}]")
+    client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+from datetime import datetime
+from models.user import mongo
+import uuid
+
+
+class DetectionJob:
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+    @staticmethod
+    def create(user_id, filename):
+        now = datetime.utcnow()
+        job_data = {
+            '_id': str(uuid.uuid4()),
+            'user_id': user_id,
+            'filename': filename,
+            'status': DetectionJob.QUEUED,
+            'rows_total': None,
+            'rows_done': 0,
+            'summary': {},
+            'error': None,
+            'created_at': now,
+            'updated_at': now
+        }
+        mongo.db.ml_jobs.insert_one(job_data)
+        return job_data['_id']
+
+    @staticmethod
+    def find_by_id(job_id):
+        return mongo.db.ml_jobs.find_one({'_id': job_id})
+
+    @staticmethod
+    def start(job_id, rows_total):
+        mongo.db.ml_jobs.update_one(
+            {'_id': job_id},
+            {'$set': {
+                'status': DetectionJob.RUNNING,
+                'rows_total': rows_total,
+                'updated_at': datetime.utcnow()
+            }}
+        )
+
+    @staticmethod
+    def add_results(job_id, results, first_seq):
+        """Store one chunk of row results and advance the job's progress.
+
+        Results carry their own created_at, which the TTL index on
+        ml_job_results expires them by.
+        """
+        now = datetime.utcnow()
+        if results:
+            mongo.db.ml_job_results.insert_many(
+                [
+                    {'job_id': job_id, 'seq': first_seq + i, 'result': result, 'created_at': now}
+                    for i, result in enumerate(results)
+                ],
+                ordered=False
+            )
+
+        model_counts = {}
+        for result in results:
+            model_counts[result['model_name']] = model_counts.get(result['model_name'], 0) + 1
+
+        mongo.db.ml_jobs.update_one(
+            {'_id': job_id},
+            {
+                '$inc': {
+                    'rows_done': len(results),
+                    **{f'summary.{name}': count for name, count in model_counts.items()}
+                },
+                '$set': {'updated_at': now}
+            }
+        )
+
+    @staticmethod
+    def complete(job_id):
+        mongo.db.ml_jobs.update_one(
+            {'_id': job_id},
+            {'$set': {'status': DetectionJob.COMPLETED, 'updated_at': datetime.utcnow()}}
+        )
+
+    @staticmethod
+    def fail(job_id, error):
+        mongo.db.ml_jobs.update_one(
+            {'_id': job_id},
+            {'$set': {
+                'status': DetectionJob.FAILED,
+                'error': error,
+                'updated_at': datetime.utcnow()
+            }}
+        )
+
+    @staticmethod
+    def get_results(job_id, page, per_page):
+        cursor = (
+            mongo.db.ml_job_results.find({'job_id': job_id}, {'_id': 0, 'result': 1})
+            .sort('seq', 1)
+            .skip((page - 1) * per_page)
+            .limit(per_page)
+        )
+        return [doc['result'] for doc in cursor]
+
+    @staticmethod
+    def to_json(job_data):
+        return {
+            'id': job_data['_id'],
+            'filename': job_data['filename'],
+            'status': job_data['status'],
+            'progress': {
+                'rows_done': job_data['rows_done'],
+                'rows_total': job_data['rows_total']
+            },
+            'summary': job_data['summary'],
+            'error': job_data['error'],
+            'created_at': job_data['created_at'],
+            'updated_at': job_data['updated_at']
+        }
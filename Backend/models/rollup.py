@@ -0,0 +1,78 @@
+from models.user import mongo
+
+DAY_FORMAT = '%Y-%m-%d'
+MALICIOUS_THRESHOLD = 0.5
+
+
+class DetectionRollup:
+    """Per user, per UTC day and per attack type detection counts.
+
+    Documents look like ``{user_id, day, attack_type, total, malicious, ham}``
+    where ``day`` is a ``YYYY-MM-DD`` string. They are kept up to date by
+    ``save_detection_results`` so the dashboard never reads raw detections.
+    """
+
+    @staticmethod
+    def is_malicious(detection):
+        probabilities = (detection.get('prediction') or {}).get('probabilities') or {}
+        return probabilities.get('malicious', 0) > MALICIOUS_THRESHOLD
+
+    @staticmethod
+    def add(user_id, created_at, detections_by_type):
+        """Fold one upload's detections into the rollups with $inc upserts.
+
+        An upload shares one created_at, so this is one upsert per attack type.
+        """
+        day = created_at.strftime(DAY_FORMAT)
+        for attack_type, detections in detections_by_type.items():
+            malicious = sum(1 for d in detections if DetectionRollup.is_malicious(d))
+            mongo.db.detection_daily_rollups.update_one(
+                {'user_id': user_id, 'day': day, 'attack_type': attack_type},
+                {'$inc': {
+                    'total': len(detections),
+                    'malicious': malicious,
+                    'ham': len(detections) - malicious
+                }},
+                upsert=True
+            )
+
+    @staticmethod
+    def rebuild(collections):
+        """Recompute every rollup from the raw detections and replace them.
+
+        `collections` maps attack types to detection collection names. Run it
+        while no uploads are being saved, or their counts may be lost.
+        """
+        rollups = []
+        for attack_type, collection_name in collections.items():
+            pipeline = [
+                {'$group': {
+                    '_id': {
+                        'user_id': '$user_id',
+                        'day': {'$dateToString': {'format': DAY_FORMAT, 'date': '$created_at'}}
+                    },
+                    'total': {'$sum': 1},
+                    'malicious': {'$sum': {'$cond': [
+                        {'$gt': [
+                            {'$ifNull': ['$detection_data.prediction.probabilities.malicious', 0]},
+                            MALICIOUS_THRESHOLD
+                        ]},
+                        1,
+                        0
+                    ]}}
+                }}
+            ]
+            for doc in mongo.db[collection_name].aggregate(pipeline):
+                rollups.append({
+                    'user_id': doc['_id'].get('user_id'),
+                    'day': doc['_id']['day'],
+                    'attack_type': attack_type,
+                    'total': doc['total'],
+                    'malicious': doc['malicious'],
+                    'ham': doc['total'] - doc['malicious']
+                })
+
+        mongo.db.detection_daily_rollups.delete_many({})
+        if rollups:
+            mongo.db.detection_daily_rollups.insert_many(rollups)
+        return len(rollups)
@@ -21,7 +21,7 @@ class User:
         user.id = data['_id']
         user.username = data['username']
         user.email = data['email']
-        user.password = data['password']
+        user.password = data.get('password')
         user.is_admin = data['is_admin']
         user.created_at = data['created_at']
         user.updated_at = data['updated_at']
@@ -66,6 +66,19 @@ class User:
         users = mongo.db.users.find()
         return [User.from_dict(user) for user in users]
 
+    @staticmethod
+    def get_users_page(page=None, per_page=None):
+        """Return users oldest first without password hashes, one page of them
+        when per_page is given and all of them otherwise."""
+        users = mongo.db.users.find({}, {'password': 0}).sort('created_at', 1)
+        if per_page is not None:
+            users = users.skip((page - 1) * per_page).limit(per_page)
+        return [User.from_dict(user) for user in users]
+
+    @staticmethod
+    def count_users():
+        return mongo.db.users.count_documents({})
+
     def verify_password(self, password):
         return check_password_hash(self.password, password)
 
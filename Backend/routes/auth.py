@@ -1,8 +1,8 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
 from models.user import User
 from werkzeug.security import check_password_hash
-from .dashboard import get_detection_counts
+from .dashboard import get_scan_totals_by_user
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -77,12 +77,30 @@ def get_current_user():
 
 @auth_bp.route('/userList', methods=['GET'])
 def get_user_list():
-    users = User.get_all_users()
+    # Pagination is opt-in: without page/per_page every user is returned
+    paginated = 'page' in request.args or 'per_page' in request.args
+    page = per_page = None
+    if paginated:
+        try:
+            page = max(int(request.args.get('page', 1)), 1)
+            per_page = int(request.args.get('per_page', current_app.config['USER_LIST_PAGE_SIZE']))
+            per_page = min(max(per_page, 1), current_app.config['USER_LIST_MAX_PAGE_SIZE'])
+        except ValueError:
+            return jsonify({'message': 'page and per_page must be integers'}), 400
+
+    users = User.get_users_page(page, per_page)
+    scan_totals = get_scan_totals_by_user(
+        [user.id for user in users] if paginated else None
+    )
     user_list = []
     for user in users:
-        totalScan = get_detection_counts(user.id)
-        count = totalScan.get("total", 0)
         user_data = user.to_json()
-        user_data['totalScan'] = count
+        user_data['totalScan'] = scan_totals.get(user.id, 0)
         user_list.append(user_data)
-    return jsonify({'users': user_list}), 200
\ No newline at end of file
+
+    response = {'users': user_list}
+    if paginated:
+        response.update({'page': page, 'per_page': per_page, 'total': User.count_users()})
+    else:
+        response['total'] = len(user_list)
+    return jsonify(response), 200
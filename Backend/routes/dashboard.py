@@ -1,6 +1,9 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.user import mongo
+from .detection_results import COLLECTIONS
+from .stats_cache import stats_cache
+from models.rollup import DAY_FORMAT
 from datetime import datetime, timedelta
 from bson import json_util
 import json
@@ -23,54 +26,85 @@ def get_dashboard_stats():
         user_id = request.args.get("user_id")
         if not user_id:
             user_id = get_jwt_identity()
-        query_filter = {}
-        if user_id:
-            query_filter = {"user_id": user_id}
-        total_phishing = mongo.db.phishing_detections.count_documents(query_filter)
-        total_sqli = mongo.db.sqli_detections.count_documents(query_filter)
-        total_ddos = mongo.db.ddos_detections.count_documents(query_filter)
-        total_scans = total_phishing + total_sqli + total_ddos
-        usage_by_day = get_usage_by_day(user_id)
-        detection_counts = get_detection_counts(user_id)
-        result = {
-            "total_scans": total_scans,
-            "usage_by_day": usage_by_day,
-            "detection_counts": detection_counts,
-        }
+        days = request.args.get("days", type=int) or current_app.config["DASHBOARD_USAGE_DAYS"]
+        days = min(max(days, 1), current_app.config["DASHBOARD_MAX_USAGE_DAYS"])
+        result = stats_cache.get_or_compute(
+            (user_id, "stats", days), lambda: build_dashboard_stats(user_id, days)
+        )
         return jsonify(result)
     except Exception as e:
         logger.error(f"Error retrieving dashboard stats: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 
-def get_usage_by_day(user_id=None):
+@dashboard_bp.route("/cache-stats", methods=["GET"])
+def get_cache_stats():
+    return jsonify(stats_cache.stats())
+
+
+def build_dashboard_stats(user_id=None, days=7):
+    scan_stats = get_scan_stats(user_id, days)
+    detection_counts = get_detection_counts(user_id)
+    return {
+        "total_scans": scan_stats["total_scans"],
+        "usage_by_day": scan_stats["usage_by_day"],
+        "detection_counts": detection_counts,
+    }
+
+
+def get_scan_stats(user_id=None, days=7):
+    """Total scans per attack type and daily usage for the last `days` days,
+    read from the daily rollups in a single aggregation round trip."""
     try:
         today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        date_range = [(today - timedelta(days=i)) for i in range(7)]
+        date_range = [
+            (today - timedelta(days=i)).strftime(DAY_FORMAT) for i in range(days)
+        ]
         date_range.reverse()
-        results = []
         query_filter = {}
         if user_id:
             query_filter = {"user_id": user_id}
-        for date in date_range:
-            next_date = date + timedelta(days=1)
-            date_query = {
-                **query_filter,
-                "created_at": {"$gte": date, "$lt": next_date},
-            }
-            phishing_count = mongo.db.phishing_detections.count_documents(date_query)
-            sqli_count = mongo.db.sqli_detections.count_documents(date_query)
-            ddos_count = mongo.db.ddos_detections.count_documents(date_query)
-            day_count = phishing_count + sqli_count + ddos_count
-            formatted_date = date.strftime("%Y-%m-%d")
-            results.append({"date": formatted_date, "count": day_count})
-        return results
+        pipeline = [
+            {"$match": query_filter},
+            {
+                "$facet": {
+                    "totals": [
+                        {"$group": {"_id": "$attack_type", "count": {"$sum": "$total"}}}
+                    ],
+                    "usage_by_day": [
+                        {"$match": {"day": {"$gte": date_range[0], "$lte": date_range[-1]}}},
+                        {"$group": {"_id": "$day", "count": {"$sum": "$total"}}},
+                    ],
+                }
+            },
+        ]
+        facets = next(mongo.db.detection_daily_rollups.aggregate(pipeline))
+        totals = {doc["_id"]: doc["count"] for doc in facets["totals"]}
+        day_counts = {doc["_id"]: doc["count"] for doc in facets["usage_by_day"]}
+        usage_by_day = [
+            {"date": date, "count": day_counts.get(date, 0)} for date in date_range
+        ]
+        return {
+            "totals": {attack_type: totals.get(attack_type, 0) for attack_type in COLLECTIONS},
+            "total_scans": sum(totals.values()),
+            "usage_by_day": usage_by_day,
+        }
     except Exception as e:
-        logger.error(f"Error in get_usage_by_day: {str(e)}")
+        logger.error(f"Error in get_scan_stats: {str(e)}")
         raise
 
 
+def get_usage_by_day(user_id=None, days=7):
+    return get_scan_stats(user_id, days)["usage_by_day"]
+
+
 def get_detection_counts(user_id=None):
+    return stats_cache.get_or_compute(
+        (user_id, "detection_counts"), lambda: count_detections(user_id)
+    )
+
+
+def count_detections(user_id=None):
     try:
         detection_counts = {
             "ddos": 0,
@@ -81,36 +115,19 @@ def get_detection_counts(user_id=None):
         query_filter = {}
         if user_id:
             query_filter = {"user_id": user_id}
-        phishing_docs = list(mongo.db.phishing_detections.find(query_filter))
-        sqli_docs = list(mongo.db.sqli_detections.find(query_filter))
-        ddos_docs = list(mongo.db.ddos_detections.find(query_filter))
-        for doc in ddos_docs:
-            detection_data = doc.get("detection_data", {})
-            prediction = detection_data.get("prediction", {})
-            probabilities = prediction.get("probabilities", {})
-            malicious_prob = probabilities.get("malicious", 0)
-            if malicious_prob > 0.5:
-                detection_counts["ddos"] += 1
-            else:
-                detection_counts["ham"] += 1
-        for doc in phishing_docs:
-            detection_data = doc.get("detection_data", {})
-            prediction = detection_data.get("prediction", {})
-            probabilities = prediction.get("probabilities", {})
-            malicious_prob = probabilities.get("malicious", 0)
-            if malicious_prob > 0.5:
-                detection_counts["phishing"] += 1
-            else:
-                detection_counts["ham"] += 1
-        for doc in sqli_docs:
-            detection_data = doc.get("detection_data", {})
-            prediction = detection_data.get("prediction", {})
-            probabilities = prediction.get("probabilities", {})
-            malicious_prob = probabilities.get("malicious", 0)
-            if malicious_prob > 0.5:
-                detection_counts["sqli"] += 1
-            else:
-                detection_counts["ham"] += 1
+        pipeline = [
+            {"$match": query_filter},
+            {
+                "$group": {
+                    "_id": "$attack_type",
+                    "malicious": {"$sum": "$malicious"},
+                    "ham": {"$sum": "$ham"},
+                }
+            },
+        ]
+        for doc in mongo.db.detection_daily_rollups.aggregate(pipeline):
+            detection_counts[doc["_id"]] += doc["malicious"]
+            detection_counts["ham"] += doc["ham"]
         total = sum(detection_counts.values())
         percentages = {}
         if total > 0:
@@ -120,5 +137,23 @@ def get_detection_counts(user_id=None):
             percentages = {key: 0 for key in detection_counts.keys()}
         return {"counts": detection_counts, "percentages": percentages, "total": total}
     except Exception as e:
-        logger.error(f"Error in get_detection_counts: {str(e)}")
-        raise
\ No newline at end of file
+        logger.error(f"Error in count_detections: {str(e)}")
+        raise
+
+
+def get_scan_totals_by_user(user_ids=None):
+    """Total scans per user for all of `user_ids` (every user when None), read
+    from the daily rollups."""
+    query_filter = {"user_id": {"$ne": None}}
+    if user_ids is not None:
+        if not user_ids:
+            return {}
+        query_filter = {"user_id": {"$in": list(user_ids)}}
+    pipeline = [
+        {"$match": query_filter},
+        {"$group": {"_id": "$user_id", "total": {"$sum": "$total"}}},
+    ]
+    return {
+        doc["_id"]: doc["total"]
+        for doc in mongo.db.detection_daily_rollups.aggregate(pipeline)
+    }
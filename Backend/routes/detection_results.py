@@ -1,10 +1,14 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.user import mongo
+from models.rollup import DetectionRollup
+from .stats_cache import stats_cache
+from config import Config
 from datetime import datetime
 import logging
 import json
 from bson import json_util
+from pymongo.errors import BulkWriteError
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -12,78 +16,89 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def save_detection_results(results, user_id=None):
-    saved_results = {"phishing": [], "sqli": [], "ddos": []}
+COLLECTIONS = {
+    "phishing": "phishing_detections",
+    "sqli": "sqli_detections",
+    "ddos": "ddos_detections",
+}
+LABELS = {"phishing": "phishing", "sqli": "SQLi", "ddos": "DDoS"}
+
+
+def record_saved_detections(user_id, created_at, attack_type, detections):
+    """Keep the daily rollups and the dashboard cache in step with stored detections."""
+    if not detections:
+        return
+    DetectionRollup.add(user_id, created_at, {attack_type: detections})
+    stats_cache.invalidate(user_id)
+
+
+def save_detection_results(results, user_id=None, batch_size=None):
+    """Store detections with batched, unordered insert_many calls.
+
+    All detections of one upload share a single created_at timestamp. The daily
+    rollups read by the dashboard are updated after every stored batch, so a
+    later failure cannot leave stored detections uncounted. Returns the number
+    of inserted documents per attack type.
+    """
+    batch_size = batch_size or Config.DETECTION_INSERT_BATCH_SIZE
+    created_at = datetime.utcnow()
+    saved_counts = {}
     logger.info(f"Running save_detection_results for user: {user_id}")
     logger.info(
         f"Number of detections: phishing={len(results.get('phishing', []))}, "
         f"sqli={len(results.get('sqli', []))}, ddos={len(results.get('ddos', []))}"
     )
     try:
-        if "phishing" in results and results["phishing"]:
+        for attack_type, collection_name in COLLECTIONS.items():
+            detections = results.get(attack_type)
+            if not detections:
+                continue
             try:
-                for detection in results["phishing"]:
-                    detection_with_meta = {
-                        "user_id": user_id,
-                        "created_at": datetime.utcnow(),
-                        "detection_data": detection,
-                    }
-                    result = mongo.db.phishing_detections.insert_one(
-                        detection_with_meta
+                collection = mongo.db[collection_name]
+                inserted = 0
+                for start in range(0, len(detections), batch_size):
+                    batch_detections = detections[start:start + batch_size]
+                    batch = [
+                        {
+                            "user_id": user_id,
+                            "created_at": created_at,
+                            "detection_data": detection,
+                        }
+                        for detection in batch_detections
+                    ]
+                    try:
+                        result = collection.insert_many(batch, ordered=False)
+                    except BulkWriteError as e:
+                        # Unordered inserts keep going past failures, so roll up
+                        # every document that did get stored before re-raising
+                        failed = {error["index"] for error in e.details.get("writeErrors", [])}
+                        stored = [
+                            detection for i, detection in enumerate(batch_detections)
+                            if i not in failed
+                        ]
+                        inserted += len(stored)
+                        saved_counts[attack_type] = inserted
+                        record_saved_detections(user_id, created_at, attack_type, stored)
+                        raise
+                    inserted += len(result.inserted_ids)
+                    saved_counts[attack_type] = inserted
+                    record_saved_detections(
+                        user_id, created_at, attack_type, batch_detections
                     )
-                    detection_with_meta["_id"] = result.inserted_id
-                    saved_results["phishing"].append(detection_with_meta)
-                logger.info(
-                    f"Successfully saved {len(saved_results['phishing'])} phishing detections"
-                )
-            except Exception as e:
-                logger.error(f"Error saving phishing detections: {str(e)}")
-                raise
-        if "sqli" in results and results["sqli"]:
-            try:
-                for detection in results["sqli"]:
-                    detection_with_meta = {
-                        "user_id": user_id,
-                        "created_at": datetime.utcnow(),
-                        "detection_data": detection,
-                    }
-                    result = mongo.db.sqli_detections.insert_one(detection_with_meta)
-                    detection_with_meta["_id"] = result.inserted_id
-                    saved_results["sqli"].append(detection_with_meta)
-                logger.info(
-                    f"Successfully saved {len(saved_results['sqli'])} SQLi detections"
-                )
-            except Exception as e:
-                logger.error(f"Error saving SQLi detections: {str(e)}")
-                raise
-        if "ddos" in results and results["ddos"]:
-            try:
-                for detection in results["ddos"]:
-                    detection_with_meta = {
-                        "user_id": user_id,
-                        "created_at": datetime.utcnow(),
-                        "detection_data": detection,
-                    }
-                    result = mongo.db.ddos_detections.insert_one(detection_with_meta)
-                    detection_with_meta["_id"] = result.inserted_id
-                    saved_results["ddos"].append(detection_with_meta)
                 logger.info(
-                    f"Successfully saved {len(saved_results['ddos'])} DDoS detections"
+                    f"Successfully saved {inserted} {LABELS[attack_type]} detections"
                 )
             except Exception as e:
-                logger.error(f"Error saving DDoS detections: {str(e)}")
+                logger.error(f"Error saving {LABELS[attack_type]} detections: {str(e)}")
                 raise
-        for attack_type in list(saved_results.keys()):
-            if not saved_results[attack_type]:
-                del saved_results[attack_type]
-        if saved_results:
-            total_saved = sum(len(items) for items in saved_results.values())
+        if saved_counts:
+            total_saved = sum(saved_counts.values())
             logger.info(
                 f"Successfully saved a total of {total_saved} detection results"
             )
         else:
             logger.warning("No detection results were saved")
-        return saved_results
+        return saved_counts
     except Exception as e:
         logger.error(f"Error in save_detection_results: {str(e)}")
         raise e
@@ -1,3 +1,4 @@
+import gc
 import sys
 import json
 from pathlib import Path
@@ -8,30 +9,110 @@ from bson.objectid import ObjectId
 project_root = str(Path(__file__).resolve().parent.parent.parent)
 sys.path.append(project_root)
 
-from flask import Blueprint, request, jsonify
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, request, jsonify, current_app, send_file, url_for
 from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request, jwt_required
+from werkzeug.http import is_resource_modified
 from werkzeug.utils import secure_filename
 import os
+import tempfile
 
 from ML.main import MLDetectionSystem
 from ML.src.metrics_manager import MetricsManager
 from routes.detection_results import save_detection_results
 from models.user import mongo
+from models.job import DetectionJob
 
 ml_bp = Blueprint("ml", __name__)
 
-detection_system = MLDetectionSystem()
 metrics_manager = MetricsManager()
 
+# Created on first use; its models are loaded lazily by the ML model registry
+detection_system = None
 
-@ml_bp.route("/process", methods=["POST"])
-def process_file():
-    user_id = None
+# Background pool for job-mode uploads, created on first use
+job_executor = None
+
+
+def get_detection_system():
+    global detection_system
+    if detection_system is None:
+        detection_system = MLDetectionSystem()
+    return detection_system
+
+
+def preload_models():
+    """Load every model now, e.g. in a gunicorn master started with --preload,
+    so forked workers share the loaded models copy-on-write."""
+    status = get_detection_system().preload()
+    # Keep the garbage collector from touching (and so copying) the model pages
+    gc.freeze()
+    return status
+
+
+def get_job_executor():
+    global job_executor
+    if job_executor is None:
+        job_executor = ThreadPoolExecutor(
+            max_workers=current_app.config["ML_JOB_WORKERS"],
+            thread_name_prefix="ml-job",
+        )
+    return job_executor
+
+
+def get_optional_user_id():
     try:
         verify_jwt_in_request(optional=True)
-        user_id = get_jwt_identity()
+        return get_jwt_identity()
     except:
-        pass
+        return None
+
+
+def format_results_for_storage(results):
+    formatted_results = {"phishing": [], "sqli": [], "ddos": []}
+
+    for r in results:
+        if r["prediction"] and "error" not in r["prediction"]:
+            attack_type = r["classification"]["prediction"].lower()
+            if attack_type in ["phishing", "sqli", "ddos"]:
+                formatted_results[attack_type].append(
+                    {
+                        "classification": r["classification"],
+                        "prediction": r["prediction"],
+                        "row_index": r.get("row_index"),
+                    }
+                )
+
+    for attack_type in list(formatted_results.keys()):
+        if not formatted_results[attack_type]:
+            del formatted_results[attack_type]
+
+    return formatted_results
+
+
+def run_detection_job(job_id, file_path, user_id, chunksize):
+    try:
+        DetectionJob.start(job_id, MLDetectionSystem.count_rows(file_path, chunksize))
+
+        rows_done = 0
+        for results in get_detection_system().process_chunks(file_path, chunksize):
+            formatted_results = format_results_for_storage(results)
+            if formatted_results:
+                save_detection_results(formatted_results, user_id)
+            DetectionJob.add_results(job_id, results, rows_done)
+            rows_done += len(results)
+
+        DetectionJob.complete(job_id)
+    except Exception as e:
+        print(f"Error processing job {job_id}: {str(e)}")
+        DetectionJob.fail(job_id, str(e))
+    finally:
+        os.remove(file_path)
+
+
+@ml_bp.route("/process", methods=["POST"])
+def process_file():
+    user_id = get_optional_user_id()
 
     if "file" not in request.files:
         return jsonify({"error": "No file provided"}), 400
@@ -43,39 +124,24 @@ def process_file():
     if not file.filename.endswith(".csv"):
         return jsonify({"error": "Only CSV files are allowed"}), 400
 
-    try:
-        filename = secure_filename(file.filename)
-        temp_path = os.path.join("/tmp", filename)
-        file.save(temp_path)
-
-        result = detection_system.process_input(temp_path)
+    if request.args.get("mode") == "job":
+        return submit_detection_job(file, user_id)
 
-        os.remove(temp_path)
+    try:
+        # Parse the upload straight from the request stream, without a temp copy
+        result = get_detection_system().process_input(
+            file.stream, chunksize=current_app.config["ML_PROCESS_CHUNKSIZE"]
+        )
 
         if "error" in result:
             return jsonify({"error": result["error"]}), 500
 
-        formatted_results = {"phishing": [], "sqli": [], "ddos": []}
-
-        for r in result["results"]:
-            if r["prediction"] and "error" not in r["prediction"]:
-                attack_type = r["classification"]["prediction"].lower()
-                if attack_type in ["phishing", "sqli", "ddos"]:
-                    formatted_results[attack_type].append(
-                        {
-                            "classification": r["classification"],
-                            "prediction": r["prediction"],
-                            "row_index": r.get("row_index"),
-                        }
-                    )
-
-        for attack_type in list(formatted_results.keys()):
-            if not formatted_results[attack_type]:
-                del formatted_results[attack_type]
+        formatted_results = format_results_for_storage(result["results"])
 
         if formatted_results:
-            saved_results = save_detection_results(formatted_results, user_id)
+            saved_counts = save_detection_results(formatted_results, user_id)
             result["saved_results"] = True
+            result["saved_counts"] = saved_counts
 
         return jsonify(result)
 
@@ -84,13 +150,115 @@ def process_file():
         return jsonify({"error": str(e)}), 500
 
 
+def submit_detection_job(file, user_id):
+    temp_path = None
+    try:
+        # Unique path so concurrent uploads with the same name do not collide
+        fd, temp_path = tempfile.mkstemp(suffix=".csv")
+        os.close(fd)
+        file.save(temp_path)
+
+        job_id = DetectionJob.create(user_id, secure_filename(file.filename))
+        get_job_executor().submit(
+            run_detection_job,
+            job_id,
+            temp_path,
+            user_id,
+            current_app.config["ML_JOB_CHUNKSIZE"],
+        )
+
+        return jsonify({"job_id": job_id, "status": DetectionJob.QUEUED}), 202
+
+    except Exception as e:
+        print(f"Error submitting job: {str(e)}")
+        # The worker only owns the file once the job has been submitted
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+        return jsonify({"error": str(e)}), 500
+
+
+@ml_bp.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    user_id = get_optional_user_id()
+
+    job = DetectionJob.find_by_id(job_id)
+    if not job or (job["user_id"] and job["user_id"] != user_id):
+        return jsonify({"error": "Job not found"}), 404
+
+    try:
+        page = max(int(request.args.get("page", 1)), 1)
+        per_page = int(
+            request.args.get("per_page", current_app.config["ML_JOB_PAGE_SIZE"])
+        )
+        per_page = min(max(per_page, 1), current_app.config["ML_JOB_MAX_PAGE_SIZE"])
+    except ValueError:
+        return jsonify({"error": "page and per_page must be integers"}), 400
+
+    return jsonify(
+        {
+            "job": DetectionJob.to_json(job),
+            "results": DetectionJob.get_results(job_id, page, per_page),
+            "page": page,
+            "per_page": per_page,
+        }
+    )
+
+
+def conditional_metrics_response(version, build_metrics):
+    """Answer with 304 when the client's cached copy is current, else the
+    metrics JSON tagged with an ETag and Last-Modified."""
+    if not is_resource_modified(
+        request.environ, etag=version["etag"], last_modified=version["last_modified"]
+    ):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(build_metrics())
+    response.set_etag(version["etag"])
+    response.last_modified = version["last_modified"]
+    # Let browsers keep the images but revalidate them on every load
+    response.cache_control.no_cache = True
+    return response
+
+
+@ml_bp.route("/models", methods=["GET"])
+def get_model_status():
+    return jsonify({"models": get_detection_system().model_status()}), 200
+
+
+@ml_bp.route("/metrics/manifest", methods=["GET"])
+def get_metrics_manifest():
+    try:
+        manifest = metrics_manager.get_manifest()
+        for model_type, plots in manifest.items():
+            for plot in plots:
+                plot["url"] = url_for(
+                    "ml.get_metric_image", model_type=model_type, name=plot["name"]
+                )
+        return jsonify(manifest), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@ml_bp.route("/metrics/<model_type>/<name>.png", methods=["GET"])
+def get_metric_image(model_type, name):
+    image_path = metrics_manager.get_metric_image_path(model_type, name)
+    if image_path is None:
+        return jsonify({"error": f"Unknown metric image: {model_type}/{name}.png"}), 404
+    # send_file streams from disk and handles ETag, If-Modified-Since and Range
+    response = send_file(image_path, mimetype="image/png", conditional=True, max_age=0)
+    response.cache_control.no_cache = True
+    return response
+
+
 @ml_bp.route("/metrics/<model_type>", methods=["GET"])
 def get_model_metrics(model_type):
     try:
-        metrics = metrics_manager.get_metrics_for_model(model_type)
-        if "error" in metrics:
-            return jsonify(metrics), 400
-        return jsonify(metrics), 200
+        version = metrics_manager.get_metrics_version(model_type)
+        if version is None:
+            return jsonify(metrics_manager.get_metrics_for_model(model_type)), 400
+        return conditional_metrics_response(
+            version, lambda: metrics_manager.get_metrics_for_model(model_type)
+        )
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -98,7 +266,8 @@ def get_model_metrics(model_type):
 @ml_bp.route("/metrics", methods=["GET"])
 def get_all_metrics():
     try:
-        metrics = metrics_manager.get_all_metrics()
-        return jsonify(metrics), 200
+        return conditional_metrics_response(
+            metrics_manager.get_metrics_version(), metrics_manager.get_all_metrics
+        )
     except Exception as e:
         return jsonify({"error": str(e)}), 500
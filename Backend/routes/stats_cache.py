@@ -0,0 +1,83 @@
+from collections import OrderedDict
+from config import Config
+import threading
+import time
+
+
+class StatsCache:
+    """Bounded LRU cache with a time-to-live for per-user dashboard numbers.
+
+    Keys are tuples whose first item is the user_id (None for all users).
+    Entries are invalidated when detections are saved, and the TTL bounds how
+    stale they can get in other worker processes. A ttl of 0 disables caching.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        # Bumped by invalidate so values computed before it are not stored
+        self._generations = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for `key`, calling `compute()` on a miss.
+
+        Cached values are shared between callers and must not be mutated.
+        """
+        if self.ttl <= 0:
+            return compute()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = (self._epoch, self._generations.get(key[0], 0))
+
+        value = compute()
+        with self._lock:
+            if (self._epoch, self._generations.get(key[0], 0)) != generation:
+                # Invalidated while computing: the value may predate the write
+                return value
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def invalidate(self, user_id):
+        """Drop the entries of `user_id` and the all-users entries."""
+        with self._lock:
+            for affected in {user_id, None}:
+                self._generations[affected] = self._generations.get(affected, 0) + 1
+            for key in [key for key in self._entries if key[0] in (user_id, None)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
+
+
+stats_cache = StatsCache(Config.DASHBOARD_CACHE_SIZE, Config.DASHBOARD_CACHE_TTL)
@@ -0,0 +1,59 @@
+"""Measure how process_dataframe_parallel scales with the number of workers.
+
+The input CSV is replicated to the requested row count, and the worker count
+doubles each run up to max_workers:
+
+    python benchmark.py data/unseen_data.csv 1000000 8
+"""
+import sys
+import time
+
+import pandas as pd
+
+from main import MIN_SHARD_ROWS, MLDetectionSystem
+
+USAGE = "Usage: python benchmark.py <data_path> <rows> <max_workers>"
+
+
+def benchmark_parallel(data_path: str, rows: int, worker_counts: list) -> None:
+    """Time process_dataframe_parallel on data_path replicated to the given row count."""
+    sample = pd.read_csv(data_path)
+    repeats = -(-rows // len(sample))
+    df = pd.concat([sample] * repeats, ignore_index=True).head(rows)
+    print(f"Benchmarking {len(df)} rows replicated from {data_path}")
+    print("-" * 50)
+
+    baseline = None
+    for workers in worker_counts:
+        system = MLDetectionSystem(workers=workers)
+        try:
+            # Warm the pool so model loading is not part of the timing
+            system.process_dataframe_parallel(df.head(workers * MIN_SHARD_ROWS))
+            start = time.perf_counter()
+            system.process_dataframe_parallel(df)
+            elapsed = time.perf_counter() - start
+        finally:
+            system.close()
+
+        baseline = baseline or elapsed
+        print(f"workers={workers}: {elapsed:.1f}s, {len(df) / elapsed:,.0f} rows/s, "
+              f"speedup {baseline / elapsed:.2f}x")
+
+
+def main():
+    if len(sys.argv) != 4:
+        print(USAGE)
+        sys.exit(1)
+    data_path = sys.argv[1]
+    rows = int(sys.argv[2])
+    max_workers = int(sys.argv[3])
+
+    # Double the worker count each run, finishing at max_workers
+    worker_counts = [1]
+    while worker_counts[-1] < max_workers:
+        worker_counts.append(min(worker_counts[-1] * 2, max_workers))
+    benchmark_parallel(data_path, rows, worker_counts)
+
+
+if __name__ == "__main__":
+    main()
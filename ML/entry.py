@@ -12,12 +12,14 @@ def main():
     try:
         # Initialize the detection system
         detection_system = MLDetectionSystem()
+        detection_system.preload()
         
         print("\nEnter the path to your input file:")
         file_path = clean_file_path(input("> "))
         
         try:
-            result = detection_system.process_input(file_path)
+            output_path = str(Path(file_path).parent / "detection_results.csv")
+            result = detection_system.process_input(file_path, output_path=output_path)
             
             if 'error' in result:
                 print(f"\nError: {result['error']}")
@@ -1,5 +1,9 @@
 import sys
+import os
+import itertools
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import numpy as np
 import pandas as pd
 import glob
 
@@ -10,151 +14,446 @@ from sms_spam_detector import SMSDetector
 from ddos_predictor import DDoSPredictor
 from predict import AttackPredictor
 from ddos_predictor import DDoSDataCleaner
+from text_preprocessing import TextPreprocessor
+from model_registry import model_registry
+
+MODEL_NAMES = {
+    "sqli": "SQL INJECTION DETECTION",
+    "phishing": "PHISHING/SMS SCAM DETECTION",
+    "ddos": "DDoS ATTACK PREDICTION",
+}
+RESULT_COLUMNS = ["row_index", "classification", "model_name", "prediction"]
+
+# Rows held in memory at once by process_input_streaming
+STREAM_CHUNKSIZE = 10_000
+
+# Frames smaller than workers * MIN_SHARD_ROWS are processed in-process
+MIN_SHARD_ROWS = 1_000
+
+# Detection system owned by each pool worker, loaded once by _init_worker.
+# Models the parent had already loaded are inherited when workers are forked
+_worker_system = None
+
+
+def _init_worker():
+    global _worker_system
+    _worker_system = MLDetectionSystem()
+    _worker_system.preload()
+
+
+def _process_shard(shard: pd.DataFrame) -> list:
+    return _worker_system.process_dataframe(shard)
 
 
 class MLDetectionSystem:
-    def __init__(self):
+    def __init__(self, workers: int = None):
+        # Number of worker processes used to shard large inputs (1 disables the pool)
+        if workers is None:
+            workers = int(os.getenv("ML_DETECTION_WORKERS", "1"))
+        self.workers = max(1, workers)
+        self._executor = None
+
         self.classifier_path = (
             Path(__file__).parent / "models" / "classifier" / "pipeline.pkl"
         )
-        self.classifier = AttackPredictor(pipeline_path=self.classifier_path)
-
         self.sqli_model_path = (
             Path(__file__).parent / "models" / "sqli" / "sqli_detector_model.pkl"
         )
-        self.sqli_detector = SQLiDetector(model_path=self.sqli_model_path)
-
         self.phishing_model_path = (
             Path(__file__).parent / "models" / "phishing" / "sms_detector_model.pkl"
         )
-        self.phishing_detector = SMSDetector(model_path=self.phishing_model_path)
-
         self.ddos_model_path = (
             Path(__file__).parent / "models" / "ddos" / "ddos_model.pkl"
         )
-        self.ddos_detector = DDoSPredictor(model_path=self.ddos_model_path)
 
+        # Models are loaded on first use through the process-wide registry
+        self._model_specs = {
+            "classifier": (self.classifier_path, lambda path: AttackPredictor(pipeline_path=path)),
+            "sqli": (self.sqli_model_path, lambda path: SQLiDetector(model_path=path)),
+            "phishing": (self.phishing_model_path, lambda path: SMSDetector(model_path=path)),
+            "ddos": (self.ddos_model_path, lambda path: DDoSPredictor(model_path=path)),
+        }
+
+    def _get_model(self, name: str):
+        path, loader = self._model_specs[name]
+        return model_registry.get((name, str(path)), lambda: loader(path))
+
+    @property
+    def classifier(self) -> AttackPredictor:
+        return self._get_model("classifier")
+
+    @property
+    def sqli_detector(self) -> SQLiDetector:
+        return self._get_model("sqli")
+
+    @property
+    def phishing_detector(self) -> SMSDetector:
+        return self._get_model("phishing")
+
+    @property
+    def ddos_detector(self) -> DDoSPredictor:
+        return self._get_model("ddos")
+
+    def preload(self) -> dict:
+        """Load every model now, e.g. before forking workers, and return model_status()."""
+        for name in self._model_specs:
+            self._get_model(name)
         print("Successfully loaded all models")
+        return self.model_status()
+
+    def model_status(self) -> dict:
+        """Report whether each model is loaded and how long loading it took."""
+        status = {}
+        for name, (path, _) in self._model_specs.items():
+            key = (name, str(path))
+            load_time = model_registry.load_time(key)
+            status[name] = {
+                "path": str(path),
+                "loaded": model_registry.is_loaded(key),
+                "load_seconds": round(load_time, 3) if load_time is not None else None,
+            }
+        return status
+
+    def process_input(
+        self,
+        filePath,
+        batch: bool = True,
+        output_path: str = None,
+        chunksize: int = None,
+    ) -> dict:
+        """Run detection on a CSV given as a path or a readable file-like object.
+
+        With chunksize the CSV is parsed chunk by chunk, so an upload stream can
+        be read without first saving it to disk. Results are only written to a
+        CSV when output_path is given.
+        """
+        try:
+            if chunksize:
+                try:
+                    chunks = self.process_chunks(filePath, chunksize)
+                    results = next(chunks, [])
+                except Exception as e:
+                    return {"error": f"Error reading CSV file: {str(e)}"}
+                for chunk_results in chunks:
+                    results.extend(chunk_results)
+            else:
+                try:
+                    df = pd.read_csv(filePath)
+                except Exception as e:
+                    return {"error": f"Error reading CSV file: {str(e)}"}
+
+                if batch:
+                    results = self.process_dataframe_parallel(df)
+                else:
+                    results = [self.process_row(idx, row) for idx, row in df.iterrows()]
+
+            response = {"results": results}
+            if output_path is not None:
+                pd.DataFrame(results, columns=RESULT_COLUMNS).to_csv(output_path, index=False)
+                response["output_file"] = output_path
+            return response
+
+        except Exception as e:
+            return {"error": f"Error processing file: {str(e)}"}
+
+    def process_input_streaming(
+        self, filePath: str, chunksize: int = STREAM_CHUNKSIZE, output_path: str = None
+    ) -> dict:
+        """Process a CSV in bounded chunks, appending each chunk's results to disk.
+
+        Only a running summary is kept in memory, so peak memory depends on
+        chunksize rather than on the size of the input file. output_path is
+        required when filePath is a file-like object.
+        """
+        if output_path is None:
+            if not isinstance(filePath, (str, os.PathLike)):
+                return {"error": "output_path is required when reading from a stream"}
+            output_path = str(Path(filePath).parent / "detection_results.csv")
 
-    def process_input(self, filePath: str) -> dict:
         try:
             try:
-                df = pd.read_csv(filePath)
+                chunks = self.process_chunks(filePath, chunksize)
+                first_results = next(chunks, [])
             except Exception as e:
                 return {"error": f"Error reading CSV file: {str(e)}"}
 
-            results = []
-            for idx, row in df.iterrows():
-                row = row.dropna()
-                text = ",".join(map(str, row))
-                
-                classification = self.classifier.predict(text)
-                attack_type = classification["prediction"].lower()
-                
-                if attack_type == "sqli":
-                    prediction = self.process_sqli_samples(pd.DataFrame([row]))
-                    model_name = "SQL INJECTION DETECTION"
-                elif attack_type == "phishing":
-                    prediction = self.process_sms_samples(pd.DataFrame([row]))
-                    model_name = "PHISHING/SMS SCAM DETECTION"
-                    if prediction and 'probabilities' in prediction[0]:
-                        prob = prediction[0]['probabilities'].get('malicious', 0)
-                        if 0.4 <= prob <= 0.6:
-                            prediction[0]['prediction'] = "Potential Malicious Message"
-                elif attack_type == "ddos":
-                    prediction = self.process_ddos_samples(pd.DataFrame([row]))
-                    model_name = "DDoS ATTACK PREDICTION"
-                else:
-                    prediction = [{"error": f"Unknown attack type: {attack_type}"}]
-                    model_name = "UNKNOWN"
-                
-                results.append({
-                    "row_index": idx,
-                    "classification": classification,
-                    "model_name": model_name,
-                    "prediction": prediction[0] if prediction else None
-                })
-            
-            output_df = pd.DataFrame(results)
-            output_path = str(Path(filePath).parent / "detection_results.csv")
-            output_df.to_csv(output_path, index=False)
-            
+            summary = {"total_rows": 0, "model_counts": {}, "error_rows": 0}
+            first_chunk = True
+            for results in itertools.chain([first_results], chunks):
+                if not results:
+                    continue
+                pd.DataFrame(results, columns=RESULT_COLUMNS).to_csv(
+                    output_path,
+                    mode="w" if first_chunk else "a",
+                    header=first_chunk,
+                    index=False,
+                )
+                first_chunk = False
+                self._update_summary(summary, results)
+
+            if first_chunk:
+                pd.DataFrame(columns=RESULT_COLUMNS).to_csv(output_path, index=False)
+
             return {
-                "results": results,
+                "summary": summary,
                 "output_file": output_path
             }
 
         except Exception as e:
             return {"error": f"Error processing file: {str(e)}"}
 
-    def process_classification(self, df: str) -> list:
-        df = df.head(5)
-        text = df.apply(lambda x: ",".join(map(str, x)), axis=1).to_list()
-        text = "\n".join(text)
+    def process_chunks(self, filePath: str, chunksize: int = STREAM_CHUNKSIZE):
+        """Yield the detection results of each chunk of a CSV, in row order."""
+        with pd.read_csv(filePath, chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield self.process_dataframe_parallel(chunk)
 
-        return self.classifier.predict(text)
+    @staticmethod
+    def count_rows(filePath: str, chunksize: int = STREAM_CHUNKSIZE) -> int:
+        """Count the data rows of a CSV without keeping more than one chunk in memory."""
+        with pd.read_csv(filePath, chunksize=chunksize, usecols=[0]) as reader:
+            return sum(len(chunk) for chunk in reader)
 
-    def process_sqli_samples(self, df: str) -> list:
+    @staticmethod
+    def _update_summary(summary: dict, results: list) -> None:
+        summary["total_rows"] += len(results)
+        for result in results:
+            model_name = result["model_name"]
+            summary["model_counts"][model_name] = summary["model_counts"].get(model_name, 0) + 1
+            if not result["prediction"] or "error" in result["prediction"]:
+                summary["error_rows"] += 1
+
+    def process_dataframe_parallel(self, df: pd.DataFrame) -> list:
+        """Shard df across the worker pool and merge the results in row order.
+
+        Falls back to process_dataframe when the pool is disabled or the frame
+        is too small for sharding to pay off.
+        """
+        if self.workers <= 1 or len(df) < self.workers * MIN_SHARD_ROWS:
+            return self.process_dataframe(df)
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker
+            )
+
+        bounds = np.linspace(0, len(df), self.workers + 1, dtype=int)
+        shards = [df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+        results = []
+        for shard_results in self._executor.map(_process_shard, shards):
+            results.extend(shard_results)
+        return results
+
+    def close(self) -> None:
+        """Shut down the worker pool, if one was started."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def process_dataframe(self, df: pd.DataFrame) -> list:
+        """Classify all rows in one router pass, then run each detector once per attack type."""
+        texts, inputs = self._row_payloads(df)
+
+        # Lowercase/split each row once and share it between the router and detectors
+        tokens = [TextPreprocessor.split_lowercase(text) for text in texts]
+        classifications = self.classifier.predict_batch(texts, tokens)
+
+        groups = {}
+        for position, classification in enumerate(classifications):
+            attack_type = classification["prediction"].lower()
+            groups.setdefault(attack_type, []).append(position)
+
+        predictions = [None] * len(df)
+        for attack_type, positions in groups.items():
+            group_texts = [texts[position] for position in positions]
+            group_inputs = [inputs[position] for position in positions]
+            group_tokens = [tokens[position] for position in positions]
+
+            if attack_type == "sqli":
+                group_predictions = self._detect_texts(
+                    self.sqli_detector, group_texts, group_inputs, "sqli", group_tokens
+                )
+            elif attack_type == "phishing":
+                group_predictions = self._detect_texts(
+                    self.phishing_detector, group_texts, group_inputs, "phishing",
+                    group_tokens
+                )
+                for prediction in group_predictions:
+                    self._flag_potential_phishing(prediction)
+            elif attack_type == "ddos":
+                group_predictions = self._detect_ddos_rows(df.iloc[positions])
+            else:
+                group_predictions = [
+                    {"error": f"Unknown attack type: {attack_type}"} for _ in positions
+                ]
+
+            for position, prediction in zip(positions, group_predictions):
+                predictions[position] = prediction
+
+        return [
+            {
+                "row_index": idx,
+                "classification": classification,
+                "model_name": MODEL_NAMES.get(
+                    classification["prediction"].lower(), "UNKNOWN"
+                ),
+                "prediction": prediction,
+            }
+            for idx, classification, prediction in zip(
+                df.index.tolist(), classifications, predictions
+            )
+        ]
+
+    def process_row(self, idx, row: pd.Series) -> dict:
+        row = row.dropna()
+        text = ",".join(map(str, row))
+        
+        classification = self.classifier.predict(text)
+        attack_type = classification["prediction"].lower()
+        
+        if attack_type == "sqli":
+            prediction = self.process_sqli_samples(pd.DataFrame([row]))
+        elif attack_type == "phishing":
+            prediction = self.process_sms_samples(pd.DataFrame([row]))
+            if prediction:
+                self._flag_potential_phishing(prediction[0])
+        elif attack_type == "ddos":
+            prediction = self.process_ddos_samples(pd.DataFrame([row]))
+        else:
+            prediction = [{"error": f"Unknown attack type: {attack_type}"}]
+        
+        return {
+            "row_index": idx,
+            "classification": classification,
+            "model_name": MODEL_NAMES.get(attack_type, "UNKNOWN"),
+            "prediction": prediction[0] if prediction else None
+        }
+
+    @staticmethod
+    def _row_payloads(df: pd.DataFrame) -> tuple:
+        """Build the joined text and the input dict of every row, skipping empty cells."""
+        columns = df.columns.tolist()
+        texts = []
+        inputs = []
+        for values in df.values:
+            present = [(col, val) for col, val in zip(columns, values) if not pd.isna(val)]
+            texts.append(",".join(str(val) for _, val in present))
+            inputs.append({col: str(val) for col, val in present})
+        return texts, inputs
+
+    @staticmethod
+    def _flag_potential_phishing(prediction: dict) -> None:
+        if 'probabilities' in prediction:
+            prob = prediction['probabilities'].get('malicious', 0)
+            if 0.4 <= prob <= 0.6:
+                prediction['prediction'] = "Potential Malicious Message"
+
+    def _detect_texts(
+        self, detector, texts: list, inputs: list, label: str, tokens: list = None
+    ) -> list:
         try:
-            results = []
-            for idx, row in df.iterrows():
-                input_data = {col: str(val) for col, val in row.items()}
-                
-                text = ",".join(map(str, row))
-                
-                result = self.sqli_detector.predict_text(text)
+            results = detector.predict_texts(texts, lowercase_tokens=tokens)
+            for result, input_data in zip(results, inputs):
                 result["input"] = input_data
-                result["predicted_label"] = "sqli"
-                results.append(result)
+                result["predicted_label"] = label
 
             return results
 
         except Exception as e:
-            return [{"error": str(e)}]
+            return [{"error": str(e)} for _ in texts]
 
-    def process_sms_samples(self, df: str) -> list:
+    def _detect_ddos_rows(self, df: pd.DataFrame) -> list:
+        """Score a group of DDoS rows, keeping the per-row handling of empty cells.
+
+        Columns that are empty for the whole group are dropped up front. Rows that
+        still have gaps are scored on their own, exactly like the row-by-row path.
+        """
         try:
-            results = []
-            for idx, row in df.iterrows():
-                input_data = {col: str(val) for col, val in row.items()}
-                
-                text = ",".join(map(str, row))
-                
-                result = self.phishing_detector.predict_text(text)
-                result["input"] = input_data
-                result["predicted_label"] = "phishing"
-                results.append(result)
+            df = df.dropna(axis=1, how="all").reset_index(drop=True)
+            complete = df.notna().all(axis=1)
 
-            return results
+            predictions = [None] * len(df)
+            complete_positions = complete[complete].index.tolist()
+            if complete_positions:
+                try:
+                    complete_predictions = self._ddos_predictions(df.loc[complete_positions])
+                except Exception:
+                    # Keep a failure on the row that caused it, not the whole group
+                    complete_predictions = [
+                        self._ddos_row_prediction(df.iloc[position])
+                        for position in complete_positions
+                    ]
+                for position, prediction in zip(complete_positions, complete_predictions):
+                    predictions[position] = prediction
+
+            for position in complete[~complete].index.tolist():
+                predictions[position] = self._ddos_row_prediction(df.iloc[position].dropna())
+
+            return predictions
 
         except Exception as e:
-            return [{"error": str(e)}]
+            return [{"error": str(e)} for _ in range(len(df))]
+
+    def _ddos_row_prediction(self, row: pd.Series) -> dict:
+        """Score a single DDoS row, returning its error instead of raising."""
+        try:
+            return self._ddos_predictions(pd.DataFrame([row]))[0]
+        except Exception as e:
+            return {"error": str(e)}
+
+    def process_classification(self, df: str) -> list:
+        df = df.head(5)
+        text = df.apply(lambda x: ",".join(map(str, x)), axis=1).to_list()
+        text = "\n".join(text)
+
+        return self.classifier.predict(text)
+
+    def process_sqli_samples(self, df: str) -> list:
+        texts, inputs = self._row_payloads(df)
+        return self._detect_texts(self.sqli_detector, texts, inputs, "sqli")
+
+    def process_sms_samples(self, df: str) -> list:
+        texts, inputs = self._row_payloads(df)
+        return self._detect_texts(self.phishing_detector, texts, inputs, "phishing")
 
     def process_ddos_samples(self, df: str) -> list:
         try:
-            cleaned_df = DDoSDataCleaner.cleanInputData(df)
-            predictions = self.ddos_detector.predict(cleaned_df)
-            cleaned_df = cleaned_df.reset_index(drop=True)
-            predictions = predictions.reset_index(drop=True)
-            cleaned_df['prediction'] = predictions['Predicted']
-            cleaned_df['benign_probability'] = predictions['BENIGN_Probability']
-            cleaned_df['ddos_probability'] = predictions['DDoS_Probability']
-            
-            results = []
-            for idx, row in cleaned_df.iterrows():
-                input_data = {col: str(val) for col, val in row.items() if col not in ['prediction', 'benign_probability', 'ddos_probability']}
-                result = {
-                    "input": input_data,
-                    "prediction": row['prediction'],
-                    "probabilities": {
-                        "safe": float(row['benign_probability']),
-                        "malicious": float(row['ddos_probability'])
-                    },
-                    "predicted_label": "ddos"
-                }
-                results.append(result)
-            
-            return results
+            return self._ddos_predictions(df)
 
         except Exception as e:
-            return [{"error": str(e)}]
\ No newline at end of file
+            return [{"error": str(e)}]
+
+    def _ddos_predictions(self, df: pd.DataFrame) -> list:
+        """Predict a DDoS frame, returning one result per input row in order."""
+        df = df.reset_index(drop=True)
+        cleaned_df = DDoSDataCleaner.cleanInputData(df)
+
+        results = [
+            {"error": "Row contains infinite or missing values"} for _ in range(len(df))
+        ]
+        if cleaned_df.empty:
+            return results
+
+        columns = cleaned_df.columns.tolist()
+        input_values = cleaned_df.values
+        predictions = self.ddos_detector.predict(cleaned_df)
+
+        for position, values, predicted, benign_prob, ddos_prob in zip(
+            cleaned_df.index,
+            input_values,
+            predictions['Predicted'],
+            predictions['BENIGN_Probability'],
+            predictions['DDoS_Probability'],
+        ):
+            results[position] = {
+                "input": {col: str(val) for col, val in zip(columns, values)},
+                "prediction": predicted,
+                "probabilities": {
+                    "safe": float(benign_prob),
+                    "malicious": float(ddos_prob)
+                },
+                "predicted_label": "ddos"
+            }
+
+        return results
@@ -14,7 +14,7 @@ class DDoSDataCleaner:
         return new_X.replace([np.inf, -np.inf], np.nan).dropna(axis=0)
 
 class DDoSPredictor:
-    def __init__(self, model_path='../models/ddos/ddos_model.pkl'):
+    def __init__(self, model_path='../models/ddos/ddos_model.pkl', mmap_mode='r'):
         """
         Initializes the DDoSPredictor class by loading the model and preprocessing tools.
 
@@ -22,8 +22,11 @@ class DDoSPredictor:
         -----------
         model_path : str
             Path to the trained model file
+        mmap_mode : str or None
+            Memory-map the numpy arrays of an uncompressed joblib file instead of
+            reading them into memory (None reads everything, as before)
         """
-        self.model_info = joblib.load(model_path)
+        self.model_info = joblib.load(model_path, mmap_mode=mmap_mode)
         self.voting_clf = self.model_info['voting_classifier']
         self.feature_info = self.model_info['feature_info']
         self.selected_features = self.model_info['selected_features']
@@ -32,12 +35,80 @@ class DDoSPredictor:
         self.scaler_features = self.model_info['scaler_features']
         self.numerical_cols = self.model_info['numerical_cols']
         self.categorical_cols = list(self.feature_info.keys())
+        
+        # Column of the BENIGN class in the predict_proba matrix
+        benign_label = self.label_encoder.transform(['BENIGN'])[0]
+        self.benign_idx = list(self.voting_clf.classes_).index(benign_label)
+        
+        self._build_feature_layout()
         print(f"Model loaded successfully from {model_path}")
 
+    @staticmethod
+    def _scaler_params(scaler):
+        """Return the per-feature mean and scale a StandardScaler applies."""
+        n_features = scaler.n_features_in_
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(n_features)
+        scale = scaler.scale_ if scaler.with_std else np.ones(n_features)
+        return mean, scale
+
+    def _build_feature_layout(self):
+        """
+        Maps every selected feature to where its value comes from and folds
+        both StandardScalers into one affine transform over selected_features.
+
+        Selected features are either numerical columns, hashed buckets of a
+        categorical column, or unknown to the input (always 0 before the
+        final scaling). Categorical columns without any selected bucket are
+        never hashed.
+        """
+        num_mean, num_scale = self._scaler_params(self.scaler_numerical)
+        feature_mean, feature_scale = self._scaler_params(self.scaler_features)
+
+        numerical_index = {col: i for i, col in enumerate(self.numerical_cols)}
+        hashed_index = {
+            name: (col, i)
+            for col, info in self.feature_info.items()
+            for i, name in enumerate(info['col_names'])
+        }
+
+        # scaler_features alone: (x - m2) / s2
+        self.affine_scale = 1 / feature_scale
+        self.affine_offset = -feature_mean / feature_scale
+
+        self.numerical_features = []
+        numerical_positions = []
+        self.hashed_layout = {}
+        for position, feature in enumerate(self.selected_features):
+            if feature in numerical_index:
+                # Both scalers: ((x - m1) / s1 - m2) / s2
+                i = numerical_index[feature]
+                self.affine_scale[position] = 1 / (num_scale[i] * feature_scale[position])
+                self.affine_offset[position] = (
+                    -(num_mean[i] / num_scale[i] + feature_mean[position])
+                    / feature_scale[position]
+                )
+                self.numerical_features.append(feature)
+                numerical_positions.append(position)
+            elif feature in hashed_index:
+                col, bucket = hashed_index[feature]
+                positions, buckets = self.hashed_layout.setdefault(col, ([], []))
+                positions.append(position)
+                buckets.append(bucket)
+
+        self.numerical_positions = np.array(numerical_positions, dtype=int)
+        # Raw value that scaler_numerical maps to 0, used when numericals are absent
+        self.numerical_fill = num_mean[
+            [numerical_index[feature] for feature in self.numerical_features]
+        ]
+
     def _preprocess(self, new_X):
         """
         Preprocesses the data for prediction.
 
+        Raw feature values are gathered in selected_features order and the
+        folded scaler transform is applied in one vectorized step, without
+        building intermediate DataFrames.
+
         Parameters:
         -----------
         new_X : DataFrame
@@ -45,30 +116,39 @@ class DDoSPredictor:
 
         Returns:
         --------
-        new_X_scaled : DataFrame
-            Preprocessed and scaled feature set
+        new_X_scaled : ndarray
+            Preprocessed and scaled float32 feature set
         """
-        for col in self.categorical_cols:
-            if col in new_X.columns:
+        columns = set(new_X.columns)
+        missing_numerical = [col for col in self.numerical_cols if col not in columns]
+        if missing_numerical and len(missing_numerical) < len(self.numerical_cols):
+            raise ValueError(f"Missing numerical columns: {missing_numerical}")
+
+        # scaler_numerical used to reject non-numeric values in every numerical
+        # column, selected or not; keep failing the same rows
+        non_numeric = [col for col in self.numerical_cols
+                       if col in columns and not pd.api.types.is_numeric_dtype(new_X[col])]
+        if non_numeric:
+            new_X[non_numeric].to_numpy(dtype=np.float64)
+
+        # Features that are absent from the input stay 0 before scaling
+        raw = np.zeros((len(new_X), len(self.selected_features)))
+
+        if missing_numerical:
+            raw[:, self.numerical_positions] = self.numerical_fill
+        elif self.numerical_features:
+            raw[:, self.numerical_positions] = (
+                new_X[self.numerical_features].to_numpy(dtype=np.float64)
+            )
+
+        for col, (positions, buckets) in self.hashed_layout.items():
+            if col in columns:
                 hasher = self.feature_info[col]['hasher']
-                hashed_col_names = self.feature_info[col]['col_names']
                 col_data = new_X[col].astype(str).tolist()
-                hashed_features = hasher.transform(col_data)
-                hashed_df = pd.DataFrame(hashed_features.toarray(), columns=hashed_col_names, index=new_X.index)
-                new_X = new_X.drop(col, axis=1)
-                new_X = pd.concat([new_X, hashed_df], axis=1)
-
-        numerical_present = [col for col in self.numerical_cols if col in new_X.columns]
-        if numerical_present:
-            new_X[numerical_present] = self.scaler_numerical.transform(new_X[numerical_present])
-
-        for column in self.selected_features:
-            if column not in new_X.columns:
-                new_X[column] = 0
-
-        new_X_selected = new_X[self.selected_features]
-        new_X_scaled = self.scaler_features.transform(new_X_selected)
+                raw[:, positions] = hasher.transform(col_data)[:, buckets].toarray()
 
+        new_X_scaled = np.empty(raw.shape, dtype=np.float32)
+        np.add(raw * self.affine_scale, self.affine_offset, out=new_X_scaled, casting='same_kind')
         return new_X_scaled
 
     def predict(self, data):
@@ -86,29 +166,49 @@ class DDoSPredictor:
             DataFrame with predictions and probabilities
         """
         new_X_scaled = self._preprocess(data)
-        predictions = self.voting_clf.predict(new_X_scaled)
-        predictions_labels = self.label_encoder.inverse_transform(predictions)
         
-        # Get prediction probabilities
+        # Get prediction probabilities and derive the labels from them,
+        # so the ensemble is only evaluated once
         probabilities = self.voting_clf.predict_proba(new_X_scaled)
+        predictions = self.voting_clf.classes_[probabilities.argmax(axis=1)]
+        predictions_labels = self.label_encoder.inverse_transform(predictions)
         
-        # Calculate probabilities for each row
-        benign_probs = []
-        ddos_probs = []
-        for prob in probabilities:
-            benign_idx = list(self.label_encoder.classes_).index('BENIGN')
-            benign_prob = float(prob[benign_idx])
-            benign_probs.append(benign_prob)
-            ddos_probs.append(1 - benign_prob)
+        benign_probs = probabilities[:, self.benign_idx].astype(float)
         
         results = pd.DataFrame({
             'Predicted': predictions_labels,
             'BENIGN_Probability': benign_probs,
-            'DDoS_Probability': ddos_probs
+            'DDoS_Probability': 1 - benign_probs
         })
 
         return results
 
+def verify_folded_scaling(predictor, data):
+    """
+    Compares the folded affine transform of DDoSPredictor._preprocess with
+    the fitted scaler_numerical -> scaler_features chain it replaces.
+
+    Returns:
+    --------
+    max_abs_diff : float
+        Largest absolute difference between the two feature matrices
+    """
+    frames = [pd.DataFrame(
+        predictor.scaler_numerical.transform(data[predictor.numerical_cols]),
+        columns=predictor.numerical_cols,
+        index=data.index,
+    )]
+    for col, info in predictor.feature_info.items():
+        if col in data.columns:
+            hashed = info['hasher'].transform(data[col].astype(str).tolist())
+            frames.append(pd.DataFrame(hashed.toarray(), columns=info['col_names'], index=data.index))
+    reference = pd.concat(frames, axis=1).reindex(columns=predictor.selected_features, fill_value=0)
+    reference = predictor.scaler_features.transform(reference)
+
+    folded = predictor._preprocess(data)
+    return float(np.abs(reference.astype(np.float32) - folded).max())
+
+
 if __name__ == "__main__":
     import sys
 
@@ -138,5 +238,8 @@ if __name__ == "__main__":
             print("\nAttack Type Distribution in Predictions:")
             print(results['Predicted'].value_counts())
 
+        print("\nMax abs difference between folded and fitted scalers: "
+              f"{verify_folded_scaling(predictor, data):.2e}")
+
     except Exception as e:
         print(f"Error during prediction: {e}")
\ No newline at end of file
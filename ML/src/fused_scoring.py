@@ -0,0 +1,214 @@
+import numpy as np
+from sklearn.ensemble import VotingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import MultinomialNB
+
+
+class FusedTextScorer:
+    """Score preprocessed text straight from token ids to class probabilities.
+
+    At load time the fitted vocabulary, the IDF weights and the coefficients of
+    the classifier are folded into one dense ``(n_terms, n_outputs)`` weight
+    table. Scoring a batch then only needs the token ids of each row, so no
+    count or TF-IDF sparse matrix is built.
+
+    Supported classifiers are ``MultinomialNB``, ``LogisticRegression`` and a
+    soft ``VotingClassifier`` over those two.
+    """
+
+    def __init__(self, vectorizer, tfidf, classifier):
+        self.analyzer = vectorizer.build_analyzer()
+        self.vocabulary = vectorizer.vocabulary_
+        self.binary = vectorizer.binary
+        self.classes_ = classifier.classes_
+
+        if tfidf.norm not in ('l2', 'l1', None):
+            raise TypeError(f"Unsupported TF-IDF norm: {tfidf.norm}")
+        self.norm = tfidf.norm
+        self.sublinear_tf = tfidf.sublinear_tf
+        self.idf = tfidf.idf_ if tfidf.use_idf else np.ones(len(self.vocabulary))
+
+        if isinstance(classifier, VotingClassifier):
+            if classifier.voting != 'soft':
+                raise TypeError("Only soft voting ensembles can be fused")
+            estimators = classifier.estimators_
+            self.estimator_weights = classifier._weights_not_none
+        else:
+            estimators = [classifier]
+            self.estimator_weights = None
+
+        # Each estimator owns a slice of the output columns of the weight table
+        self.estimators = []
+        weight_blocks = []
+        biases = []
+        offset = 0
+        for estimator in estimators:
+            kind, weights, bias = self._fold_estimator(estimator)
+            width = weights.shape[1]
+            self.estimators.append((kind, slice(offset, offset + width)))
+            weight_blocks.append(weights)
+            biases.append(bias)
+            offset += width
+
+        self.term_weights = self.idf[:, None] * np.hstack(weight_blocks)
+        self.bias = np.concatenate(biases)
+
+    @staticmethod
+    def _fold_estimator(estimator):
+        """Return the kind, per-term weights and bias of a linear estimator."""
+        if isinstance(estimator, MultinomialNB):
+            return 'nb', estimator.feature_log_prob_.T, estimator.class_log_prior_
+        if isinstance(estimator, LogisticRegression):
+            multi_class = getattr(estimator, 'multi_class', 'auto')
+            if len(estimator.classes_) <= 2:
+                kind = 'lr_binary'
+            elif multi_class == 'ovr' or (
+                multi_class != 'multinomial' and estimator.solver == 'liblinear'
+            ):
+                kind = 'lr_ovr'
+            else:
+                kind = 'lr_softmax'
+            return kind, estimator.coef_.T, estimator.intercept_
+        raise TypeError(f"Cannot fuse estimator of type {type(estimator).__name__}")
+
+    def _scores(self, texts):
+        """Return the raw linear scores of every text in one vectorized pass."""
+        n_terms = len(self.vocabulary)
+        row_ids = []
+        term_ids = []
+        for row, text in enumerate(texts):
+            for token in self.analyzer(text):
+                term_id = self.vocabulary.get(token)
+                if term_id is not None:
+                    row_ids.append(row)
+                    term_ids.append(term_id)
+
+        scores = np.zeros((len(texts), self.term_weights.shape[1]))
+        if term_ids:
+            # Unique (row, term) keys come back sorted by row, then term
+            keys, counts = np.unique(
+                np.asarray(row_ids, dtype=np.int64) * n_terms + np.asarray(term_ids),
+                return_counts=True,
+            )
+            rows = keys // n_terms
+            terms = keys % n_terms
+
+            if self.binary:
+                tf = np.ones(len(counts))
+            elif self.sublinear_tf:
+                tf = np.log(counts) + 1
+            else:
+                tf = counts.astype(np.float64)
+
+            starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            present_rows = rows[starts]
+            scores[present_rows] = np.add.reduceat(
+                tf[:, None] * self.term_weights[terms], starts, axis=0
+            )
+
+            if self.norm is not None:
+                values = tf * self.idf[terms]
+                if self.norm == 'l2':
+                    norms = np.sqrt(np.add.reduceat(values * values, starts))
+                else:
+                    norms = np.add.reduceat(np.abs(values), starts)
+                scores[present_rows] /= norms[:, None]
+
+        return scores + self.bias
+
+    def predict_proba(self, texts):
+        """Return class probabilities with the same layout as ``predict_proba``."""
+        texts = list(texts)
+        scores = self._scores(texts)
+
+        probabilities = []
+        for kind, columns in self.estimators:
+            block = scores[:, columns]
+            if kind == 'nb' or kind == 'lr_softmax':
+                block = np.exp(block - block.max(axis=1, keepdims=True))
+                block /= block.sum(axis=1, keepdims=True)
+            elif kind == 'lr_binary':
+                positive = 1 / (1 + np.exp(-block[:, 0]))
+                block = np.column_stack([1 - positive, positive])
+            else:
+                block = 1 / (1 + np.exp(-block))
+                block /= block.sum(axis=1, keepdims=True)
+            probabilities.append(block)
+
+        if len(probabilities) == 1:
+            return probabilities[0]
+        return np.average(probabilities, axis=0, weights=self.estimator_weights)
+
+
+def build_fused_scorer(vectorizer, tfidf, classifier):
+    """Fold a fitted text pipeline, or return None if it cannot be fused."""
+    try:
+        return FusedTextScorer(vectorizer, tfidf, classifier)
+    except (TypeError, AttributeError) as e:
+        print(f"Falling back to the sklearn pipeline: {str(e)}")
+        return None
+
+
+def main():
+    import sys
+    import time
+    from pathlib import Path
+
+    import pandas as pd
+
+    from predict import AttackPredictor
+    from sqli_detector import SQLiDetector
+    from sms_spam_detector import SMSDetector
+
+    models_dir = Path(__file__).parent.parent / "models"
+    data_path = Path(sys.argv[1]) if len(sys.argv) > 1 else (
+        Path(__file__).parent.parent / "data" / "spam.csv"
+    )
+    texts = pd.read_csv(data_path, encoding='ISO-8859-1').iloc[:, 1].astype(str).tolist()
+
+    router = AttackPredictor(pipeline_path=models_dir / "classifier" / "pipeline.pkl")
+    sqli = SQLiDetector(model_path=models_dir / "sqli" / "sqli_detector_model.pkl")
+    sms = SMSDetector(model_path=models_dir / "phishing" / "sms_detector_model.pkl")
+    models = [
+        ("router", router.preprocess_text, router.vectorizer,
+         router.tfidf_transformer, router.classifier, router.scorer),
+        ("sqli", sqli.text_preprocess, sqli.vectorizer, sqli.tfidf, sqli.ensemble, sqli.scorer),
+        ("sms", sms.text_preprocess, sms.vectorizer, sms.tfidf, sms.ensemble, sms.scorer),
+    ]
+
+    print(f"\nBenchmarking on {len(texts)} rows from {data_path}")
+    print("-" * 50)
+    for name, preprocess, vectorizer, tfidf, classifier, scorer in models:
+        if scorer is None:
+            print(f"{name}: classifier cannot be fused, skipped")
+            continue
+        cleaned = [preprocess(text) for text in texts]
+
+        start = time.perf_counter()
+        expected = classifier.predict_proba(tfidf.transform(vectorizer.transform(cleaned)))
+        sklearn_batch = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fused = scorer.predict_proba(cleaned)
+        fused_batch = time.perf_counter() - start
+
+        sample = cleaned[:500]
+        start = time.perf_counter()
+        for text in sample:
+            classifier.predict_proba(tfidf.transform(vectorizer.transform([text])))
+        sklearn_row = (time.perf_counter() - start) / len(sample)
+
+        start = time.perf_counter()
+        for text in sample:
+            scorer.predict_proba([text])
+        fused_row = (time.perf_counter() - start) / len(sample)
+
+        print(f"{name}: max abs probability diff {np.abs(expected - fused).max():.2e}")
+        print(f"  per row: sklearn {sklearn_row * 1e6:.1f}us, fused {fused_row * 1e6:.1f}us "
+              f"({sklearn_row / fused_row:.1f}x)")
+        print(f"  batch:   sklearn {sklearn_batch * 1e3:.1f}ms, fused {fused_batch * 1e3:.1f}ms "
+              f"({sklearn_batch / fused_batch:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
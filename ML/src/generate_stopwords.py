@@ -0,0 +1,38 @@
+"""Regenerate stopwords_english.py from the NLTK stopwords corpus.
+
+The detectors import the generated module, so serving never touches NLTK or
+the network. Run this once after changing NLTK data, then commit the result:
+
+    python generate_stopwords.py
+"""
+import string
+from pathlib import Path
+
+import nltk
+from nltk.corpus import stopwords
+
+OUTPUT_PATH = Path(__file__).parent / "stopwords_english.py"
+
+HEADER = '''"""English stopwords with ASCII punctuation removed.
+
+Generated by generate_stopwords.py from the NLTK stopwords corpus. Do not edit.
+"""
+
+STOPWORDS = frozenset({
+'''
+
+
+def main():
+    nltk.download('stopwords', quiet=True)
+    table = str.maketrans('', '', string.punctuation)
+    words = sorted({word.translate(table) for word in stopwords.words('english')})
+
+    lines = [HEADER]
+    lines.extend(f"    {word!r},\n" for word in words)
+    lines.append("})\n")
+    OUTPUT_PATH.write_text("".join(lines))
+    print(f"Wrote {len(words)} stopwords to {OUTPUT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,17 @@
 from pathlib import Path
+from datetime import datetime, timezone
 import base64
-from typing import Dict, List
+import hashlib
+from typing import Dict, List, Optional, Tuple
 import os
 
 class MetricsManager:
     """A class to manage and retrieve model performance metrics.
     
     This class handles loading performance metrics images and converting them to base64
-    format for easy transmission to the backend/frontend.
+    format for easy transmission to the backend/frontend. Encoded images are cached
+    and only re-read when a file's modification time or size changes, e.g. after
+    retraining.
     """
     
     def __init__(self):
@@ -26,8 +30,54 @@ class MetricsManager:
             "ddos": ["voting_performance.png", "rf_performance.png", "gb_performance.png"]
         }
 
+        # image path -> ((mtime_ns, size), base64 string)
+        self._encoded_cache: Dict[Path, Tuple[Tuple[int, int], str]] = {}
+
+    def _metric_file_paths(self, model_type: Optional[str] = None) -> List[Path]:
+        """List the metric image paths of one model type, or of all of them."""
+        model_types = [model_type] if model_type else list(self.metrics_paths.keys())
+        return [
+            self.metrics_paths[name] / metric_file
+            for name in model_types
+            for metric_file in self.metric_files[name]
+        ]
+
+    def get_metrics_version(self, model_type: Optional[str] = None) -> Optional[Dict]:
+        """Get an ETag and Last-Modified time for a model's metric images.
+
+        Only the files are stat'ed, so this is cheap enough to answer conditional
+        requests before any image is encoded.
+
+        Args:
+            model_type (str, optional): Type of model, or None for all models
+
+        Returns:
+            Optional[Dict]: {"etag": str, "last_modified": datetime}, or None for an
+            unknown model type
+        """
+        if model_type is not None:
+            model_type = model_type.lower()
+            if model_type not in self.metrics_paths:
+                return None
+
+        digest = hashlib.sha1()
+        latest_mtime = 0
+        for file_path in self._metric_file_paths(model_type):
+            try:
+                stat = file_path.stat()
+            except OSError:
+                continue
+            digest.update(f"{file_path.parent.name}/{file_path.name}:"
+                          f"{stat.st_mtime_ns}:{stat.st_size};".encode())
+            latest_mtime = max(latest_mtime, stat.st_mtime)
+
+        return {
+            "etag": digest.hexdigest(),
+            "last_modified": datetime.fromtimestamp(int(latest_mtime), tz=timezone.utc)
+        }
+
     def _image_to_base64(self, image_path: Path) -> str:
-        """Convert an image file to base64 string.
+        """Convert an image file to base64 string, reusing the cached encoding.
         
         Args:
             image_path (Path): Path to the image file
@@ -36,12 +86,61 @@ class MetricsManager:
             str: Base64 encoded string of the image, or empty string if error
         """
         try:
+            stat = image_path.stat()
+            version = (stat.st_mtime_ns, stat.st_size)
+            cached = self._encoded_cache.get(image_path)
+            if cached is not None and cached[0] == version:
+                return cached[1]
             with open(image_path, "rb") as image_file:
-                return base64.b64encode(image_file.read()).decode('utf-8')
+                encoded = base64.b64encode(image_file.read()).decode('utf-8')
+            self._encoded_cache[image_path] = (version, encoded)
+            return encoded
         except Exception as e:
             print(f"Error converting image to base64: {str(e)}")
             return ""
 
+    def get_metric_image_path(self, model_type: str, name: str) -> Optional[Path]:
+        """Get the path of one metric image, e.g. ("sqli", "roc_curve").
+        
+        Only the files listed in ``metric_files`` can be resolved, so arbitrary
+        paths cannot be requested.
+        
+        Returns:
+            Optional[Path]: Path to an existing image, or None if unknown or missing
+        """
+        model_type = model_type.lower()
+        if model_type not in self.metrics_paths:
+            return None
+        metric_file = f"{name}.png"
+        if metric_file not in self.metric_files[model_type]:
+            return None
+        file_path = self.metrics_paths[model_type] / metric_file
+        return file_path if file_path.exists() else None
+
+    def get_manifest(self) -> Dict[str, List[Dict]]:
+        """List the available metric images of every model type.
+        
+        Returns:
+            Dict[str, List[Dict]]: For each model type, the name, size in bytes and
+            modification time (epoch seconds) of each existing image
+        """
+        manifest = {}
+        for model_type in self.metrics_paths.keys():
+            plots = []
+            for metric_file in self.metric_files[model_type]:
+                file_path = self.metrics_paths[model_type] / metric_file
+                try:
+                    stat = file_path.stat()
+                except OSError:
+                    continue
+                plots.append({
+                    "name": metric_file.replace(".png", ""),
+                    "size": stat.st_size,
+                    "modified": int(stat.st_mtime)
+                })
+            manifest[model_type] = plots
+        return manifest
+
     def get_metrics_for_model(self, model_type: str) -> Dict[str, str]:
         """Get metrics for a specific model type.
         
@@ -0,0 +1,46 @@
+import threading
+import time
+
+
+class ModelRegistry:
+    """Process-wide cache of loaded models.
+
+    Each model is loaded by its loader on first use and then shared by every
+    caller in the process. Models loaded before the process forks (e.g. by a
+    gunicorn master started with ``--preload``) are inherited by the children,
+    which share the pages copy-on-write instead of unpickling their own copy.
+    """
+
+    def __init__(self):
+        self._models = {}
+        self._load_times = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        """Return the model stored under key, calling loader() on first use."""
+        model = self._models.get(key)
+        if model is None:
+            with self._lock:
+                model = self._models.get(key)
+                if model is None:
+                    start = time.perf_counter()
+                    model = loader()
+                    self._load_times[key] = time.perf_counter() - start
+                    self._models[key] = model
+                    print(f"Loaded {key[0]} in {self._load_times[key]:.2f}s")
+        return model
+
+    def is_loaded(self, key):
+        return key in self._models
+
+    def load_time(self, key):
+        """Seconds spent loading the model under key, or None if not loaded yet."""
+        return self._load_times.get(key)
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._load_times.clear()
+
+
+model_registry = ModelRegistry()
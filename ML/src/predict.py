@@ -1,7 +1,6 @@
 import pickle
-import string
-import nltk
-from nltk.corpus import stopwords
+from text_preprocessing import TextPreprocessor
+from fused_scoring import build_fused_scorer
 
 class AttackPredictor:
     def __init__(self, pipeline_path='pipeline.pkl'):
@@ -14,46 +13,65 @@ class AttackPredictor:
         self.tfidf_transformer = self.pipeline['tfidf_transformer']
         self.classifier = self.pipeline['classifier']
         
-        # Initialize stopwords
-        nltk.download('stopwords', quiet=True)
-        self.stopwords = stopwords.words('english')
-        self.stopwords_cleaned = [i.translate(str.maketrans('', '', string.punctuation)) 
-                                for i in self.stopwords]
+        # Fold the fitted pipeline into a single scoring table
+        self.scorer = build_fused_scorer(self.vectorizer, self.tfidf_transformer, self.classifier)
+        
+        # Initialize the shared preprocessor (the router keeps punctuation)
+        self.preprocessor = TextPreprocessor(strip_punctuation=False)
+        self.stopwords_cleaned = self.preprocessor.stopwords
 
     def preprocess_text(self, text):
         """Preprocess the input text"""
         if not isinstance(text, str):
             return ""
-        text = text.lower()
-        text = [word for word in text.split() if word.lower() not in self.stopwords_cleaned]
-        return " ".join(text)
+        return self.preprocessor.preprocess(text)
 
     def predict(self, input_text):
         """Make a prediction for the input text"""
-        # Preprocess input
-        input_cleaned = self.preprocess_text(input_text)
-        input_counts = self.vectorizer.transform([input_cleaned])
-        input_transf = self.tfidf_transformer.transform(input_counts)
+        return self.predict_batch([input_text])[0]
+
+    def predict_batch(self, input_texts, lowercase_tokens=None):
+        """Make predictions for a list of input texts in one vectorized pass
+
+        lowercase_tokens optionally holds the already lowercased and split tokens
+        of each text, so the split is not repeated here.
+        """
+        input_texts = list(input_texts)
+        if not input_texts:
+            return []
+
+        # Preprocess inputs and score them in a single pass
+        if lowercase_tokens is None:
+            inputs_cleaned = [self.preprocess_text(text) for text in input_texts]
+        else:
+            inputs_cleaned = [" ".join(self.preprocessor.filter_tokens(tokens))
+                              for tokens in lowercase_tokens]
+        if self.scorer is not None:
+            prediction_probs = self.scorer.predict_proba(inputs_cleaned)
+        else:
+            input_counts = self.vectorizer.transform(inputs_cleaned)
+            input_transf = self.tfidf_transformer.transform(input_counts)
+            prediction_probs = self.classifier.predict_proba(input_transf)
         
-        # Get prediction and probabilities
-        prediction = self.classifier.predict(input_transf)
-        prediction_prob = self.classifier.predict_proba(input_transf)[0]
+        # Derive predictions from the probabilities so the classifier runs once
         class_labels = self.classifier.classes_
-        pred_class_idx = list(class_labels).index(prediction[0])
-        pred_prob = prediction_prob[pred_class_idx]
-        
-        # Determine confidence level
-        confidence = "High" if pred_prob >= 0.8 else "Medium" if pred_prob >= 0.6 else "Low"
+        pred_class_idxs = prediction_probs.argmax(axis=1)
         
-        # Prepare results
-        results = {
-            'prediction': prediction[0].upper(),
-            'confidence': confidence,
-            'probabilities': {
-                label.capitalize(): float(prob) 
-                for label, prob in zip(class_labels, prediction_prob)
-            }
-        }
+        results = []
+        for prediction_prob, pred_class_idx in zip(prediction_probs, pred_class_idxs):
+            pred_prob = prediction_prob[pred_class_idx]
+            
+            # Determine confidence level
+            confidence = "High" if pred_prob >= 0.8 else "Medium" if pred_prob >= 0.6 else "Low"
+            
+            results.append({
+                'prediction': class_labels[pred_class_idx].upper(),
+                'confidence': confidence,
+                'probabilities': {
+                    label.capitalize(): float(prob) 
+                    for label, prob in zip(class_labels, prediction_prob)
+                }
+            })
         
         return results
 
@@ -1,5 +1,4 @@
 import pandas as pd
-import string
 import matplotlib.pyplot as plt
 import pickle
 import os
@@ -9,9 +8,6 @@ import numpy as np
 import base64
 from io import BytesIO
 
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
 
 from sklearn.model_selection import train_test_split
 from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
@@ -21,6 +17,8 @@ from sklearn.metrics import accuracy_score, classification_report, confusion_mat
 from sklearn.ensemble import VotingClassifier
 
 from pathlib import Path
+from text_preprocessing import TextPreprocessor
+from fused_scoring import build_fused_scorer
 
 # Get the directory where the script is located
 SCRIPT_DIR = Path(__file__).parent
@@ -29,6 +27,8 @@ class SMSDetector:
     def __init__(self, model_path=None):
         self.vectorizer = CountVectorizer()
         self.tfidf = TfidfTransformer()
+        self.preprocessor = TextPreprocessor()
+        self.scorer = None
         self.stopwords_cleaned = self._prepare_stopwords()
         
         # Initialize base models
@@ -57,19 +57,13 @@ class SMSDetector:
         
     def _prepare_stopwords(self):
         """Prepare cleaned stopwords by removing punctuation."""
-        nltk.download('stopwords', quiet=True)
-        stopwords_list = stopwords.words('english')
-        return [word.translate(str.maketrans('', '', string.punctuation)) 
-                for word in stopwords_list]
+        return self.preprocessor.stopwords
 
     def text_preprocess(self, text):
         """Preprocess text by standardizing case, removing punctuation and stopwords."""
         if not isinstance(text, str):
             text = str(text)
-        text = text.lower()
-        text = text.translate(str.maketrans('', '', string.punctuation))
-        text = [word for word in text.split() if word.lower() not in self.stopwords_cleaned]
-        return " ".join(text)
+        return self.preprocessor.preprocess(text)
 
     def load_and_prepare_data(self):
         """Load and prepare SMS spam dataset."""
@@ -88,7 +82,7 @@ class SMSDetector:
         spam_df = pd.concat([spam_df, more_df], ignore_index=True)
         spam_df.drop_duplicates(subset=['TEXT'], keep='first', inplace=True)
         spam_df['LABEL'] = spam_df['LABEL'].map({'ham': 0, 'spam': 1, 'smishing': 1})
-        spam_df['TEXT'] = spam_df['TEXT'].map(self.text_preprocess)
+        spam_df['TEXT'] = self.preprocessor.preprocess_series(spam_df['TEXT'])
         
         print("\nSMS Dataset Statistics:")
         print(f"Total samples: {len(spam_df)}")
@@ -179,6 +173,7 @@ class SMSDetector:
         
         # Train ensemble model
         self.ensemble.fit(X_train_tfidf, y_train)
+        self.scorer = build_fused_scorer(self.vectorizer, self.tfidf, self.ensemble)
         
         # Transform test data
         X_test_counts = self.vectorizer.transform(X_test)
@@ -293,33 +288,57 @@ class SMSDetector:
 
     def predict_text(self, text, update_metrics=True):
         """Predict if a given text is spam/smishing."""
-        # Preprocess text
-        processed_text = self.text_preprocess(text)
+        return self.predict_texts([text], update_metrics)[0]
+
+    def predict_texts(self, texts, update_metrics=True, lowercase_tokens=None):
+        """Predict if each text in a batch is spam/smishing.
+
+        lowercase_tokens optionally holds the already lowercased and split tokens
+        of each text (as cached by the router), so only the punctuation and
+        stopword filtering is done here.
+        """
+        texts = list(texts)
+        if not texts:
+            return []
         
-        # Transform text
-        text_counts = self.vectorizer.transform([processed_text])
-        text_tfidf = self.tfidf.transform(text_counts)
+        # Preprocess texts
+        if lowercase_tokens is None:
+            processed_texts = [self.text_preprocess(text) for text in texts]
+        else:
+            processed_texts = [" ".join(self.preprocessor.filter_tokens(tokens))
+                               for tokens in lowercase_tokens]
+        
+        # Score all texts in one pass
+        if self.scorer is not None:
+            probabilities = self.scorer.predict_proba(processed_texts)
+        else:
+            text_counts = self.vectorizer.transform(processed_texts)
+            text_tfidf = self.tfidf.transform(text_counts)
+            probabilities = self.ensemble.predict_proba(text_tfidf)
         
-        # Get prediction and probabilities
-        prediction = self.ensemble.predict(text_tfidf)[0]
-        probabilities = self.ensemble.predict_proba(text_tfidf)[0]
+        # Derive predictions from the probabilities so the ensemble runs once
+        predictions = self.ensemble.classes_[probabilities.argmax(axis=1)]
         
         # Update metrics if requested
         if update_metrics:
-            self.metrics['y_pred'].append(prediction)
-            self.metrics['y_prob'].append(probabilities[1])
+            self.metrics['y_pred'].extend(predictions)
+            self.metrics['y_prob'].extend(probabilities[:, 1])
         
-        # Determine result
-        result = "Malicious Message" if prediction == 1 else "Safe Message"
+        results = []
+        for text, prediction, probs in zip(texts, predictions, probabilities):
+            # Determine result
+            result = "Malicious Message" if prediction == 1 else "Safe Message"
+            
+            results.append({
+                'text': text,
+                'prediction': result,
+                'probabilities': {
+                    'safe': round(probs[0], 2),
+                    'malicious': round(probs[1], 2)
+                }
+            })
         
-        return {
-            'text': text,
-            'prediction': result,
-            'probabilities': {
-                'safe': round(probabilities[0], 2),
-                'malicious': round(probabilities[1], 2)
-            }
-        }
+        return results
 
     def evaluate_performance(self, X_test, y_test, save_dir=None):
         """Evaluate model performance on test data."""
@@ -411,6 +430,7 @@ class SMSDetector:
         self.vectorizer = model_data['vectorizer']
         self.tfidf = model_data['tfidf']
         self.ensemble = model_data['ensemble']
+        self.scorer = build_fused_scorer(self.vectorizer, self.tfidf, self.ensemble)
         print(f"Model loaded successfully from {model_path}")
 
 def main():
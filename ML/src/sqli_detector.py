@@ -1,11 +1,8 @@
 import pandas as pd
-import string
-import nltk
 import pickle
 import os
 import matplotlib.pyplot as plt
 import seaborn as sns
-from nltk.corpus import stopwords
 from sklearn.model_selection import train_test_split
 from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
 from sklearn.naive_bayes import MultinomialNB
@@ -13,11 +10,15 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import VotingClassifier
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, f1_score, precision_score, recall_score, roc_curve, auc
 from pathlib import Path
+from text_preprocessing import TextPreprocessor
+from fused_scoring import build_fused_scorer
 
 class SQLiDetector:
     def __init__(self, model_path=None):
         self.vectorizer = CountVectorizer()
         self.tfidf = TfidfTransformer()
+        self.preprocessor = TextPreprocessor()
+        self.scorer = None
         self.stopwords_cleaned = self._prepare_stopwords()
         
         # Initialize base models
@@ -39,19 +40,13 @@ class SQLiDetector:
         
     def _prepare_stopwords(self):
         """Prepare cleaned stopwords by removing punctuation."""
-        nltk.download('stopwords', quiet=True)
-        stopwords_list = stopwords.words('english')
-        return [word.translate(str.maketrans('', '', string.punctuation)) 
-                for word in stopwords_list]
+        return self.preprocessor.stopwords
 
     def text_preprocess(self, text):
         """Preprocess text by standardizing case, removing punctuation and stopwords."""
         if not isinstance(text, str):
             text = str(text)
-        text = text.lower()
-        text = text.translate(str.maketrans('', '', string.punctuation))
-        text = [word for word in text.split() if word.lower() not in self.stopwords_cleaned]
-        return " ".join(text)
+        return self.preprocessor.preprocess(text)
 
     def load_and_prepare_data(self):
         """Load and prepare SQLi dataset."""
@@ -67,7 +62,7 @@ class SQLiDetector:
         
         # Clean SQLi data
         sqli_df = sqli_df.dropna()  # Remove rows with missing values
-        sqli_df['TEXT'] = sqli_df['TEXT'].astype(str).map(self.text_preprocess)
+        sqli_df['TEXT'] = self.preprocessor.preprocess_series(sqli_df['TEXT'])
         
         # Convert labels to binary (1 for malicious, 0 for safe)
         # If label can be converted to float and is greater than 0, mark as malicious
@@ -171,6 +166,7 @@ class SQLiDetector:
         
         # Train ensemble model
         self.ensemble.fit(X_train_tfidf, y_train)
+        self.scorer = build_fused_scorer(self.vectorizer, self.tfidf, self.ensemble)
         
         # Transform test data
         X_test_counts = self.vectorizer.transform(X_test)
@@ -200,28 +196,52 @@ class SQLiDetector:
 
     def predict_text(self, text):
         """Predict if a given text is a SQL injection attempt."""
-        # Preprocess text
-        processed_text = self.text_preprocess(text)
+        return self.predict_texts([text])[0]
+
+    def predict_texts(self, texts, lowercase_tokens=None):
+        """Predict if each text in a batch is a SQL injection attempt.
+
+        lowercase_tokens optionally holds the already lowercased and split tokens
+        of each text (as cached by the router), so only the punctuation and
+        stopword filtering is done here.
+        """
+        texts = list(texts)
+        if not texts:
+            return []
         
-        # Transform text
-        text_counts = self.vectorizer.transform([processed_text])
-        text_tfidf = self.tfidf.transform(text_counts)
+        # Preprocess texts
+        if lowercase_tokens is None:
+            processed_texts = [self.text_preprocess(text) for text in texts]
+        else:
+            processed_texts = [" ".join(self.preprocessor.filter_tokens(tokens))
+                               for tokens in lowercase_tokens]
         
-        # Get prediction and probabilities
-        prediction = self.ensemble.predict(text_tfidf)[0]
-        probabilities = self.ensemble.predict_proba(text_tfidf)[0]
+        # Score all texts in one pass
+        if self.scorer is not None:
+            probabilities = self.scorer.predict_proba(processed_texts)
+        else:
+            text_counts = self.vectorizer.transform(processed_texts)
+            text_tfidf = self.tfidf.transform(text_counts)
+            probabilities = self.ensemble.predict_proba(text_tfidf)
         
-        # Determine result
-        result = "SQL Injection" if prediction == 1 else "Safe Query"
+        # Derive predictions from the probabilities so the ensemble runs once
+        predictions = self.ensemble.classes_[probabilities.argmax(axis=1)]
         
-        return {
-            'text': text,
-            'prediction': result,
-            'probabilities': {
-                'safe': round(probabilities[0], 2),
-                'malicious': round(probabilities[1], 2)
-            }
-        }
+        results = []
+        for text, prediction, probs in zip(texts, predictions, probabilities):
+            # Determine result
+            result = "SQL Injection" if prediction == 1 else "Safe Query"
+            
+            results.append({
+                'text': text,
+                'prediction': result,
+                'probabilities': {
+                    'safe': round(probs[0], 2),
+                    'malicious': round(probs[1], 2)
+                }
+            })
+        
+        return results
 
     def save_model(self, model_path):
         """Save the trained model and its components."""
@@ -241,6 +261,7 @@ class SQLiDetector:
         self.vectorizer = model_data['vectorizer']
         self.tfidf = model_data['tfidf']
         self.ensemble = model_data['ensemble']
+        self.scorer = build_fused_scorer(self.vectorizer, self.tfidf, self.ensemble)
         print(f"Model loaded successfully from {model_path}")
 
 def main():
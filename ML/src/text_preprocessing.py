@@ -0,0 +1,58 @@
+import string
+
+from stopwords_english import STOPWORDS
+
+# Translation table that deletes every ASCII punctuation character
+PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+
+
+def get_stopwords():
+    """Return the English stopwords with punctuation removed, as a frozenset.
+
+    The set comes from the generated stopwords_english module, so no NLTK corpus
+    or network access is needed (see generate_stopwords.py).
+    """
+    return STOPWORDS
+
+
+class TextPreprocessor:
+    """Lowercase text, optionally strip punctuation, and drop stopwords.
+
+    The router keeps punctuation while the SQLi and SMS detectors strip it, so
+    both variants share the same stopword index and translation table.
+    """
+
+    def __init__(self, strip_punctuation=True):
+        self.strip_punctuation = strip_punctuation
+        self.stopwords = get_stopwords()
+
+    @staticmethod
+    def split_lowercase(text):
+        """Lowercase the text and split it on whitespace."""
+        return text.lower().split()
+
+    def filter_tokens(self, tokens):
+        """Turn lowercase whitespace tokens into the final model tokens."""
+        if self.strip_punctuation:
+            # Stripping punctuation never introduces whitespace, so doing it per
+            # token gives the same result as translating the whole string first
+            tokens = [token.translate(PUNCTUATION_TABLE) for token in tokens]
+            return [token for token in tokens
+                    if token and token not in self.stopwords]
+        return [token for token in tokens if token not in self.stopwords]
+
+    def tokenize(self, text):
+        """Return the model tokens for a single string."""
+        return self.filter_tokens(self.split_lowercase(text))
+
+    def preprocess(self, text):
+        """Return the model tokens for a single string joined by spaces."""
+        return " ".join(self.tokenize(text))
+
+    def preprocess_series(self, series):
+        """Preprocess a whole Series, keeping its index.
+
+        Non-string values are converted with ``str`` first. Mapping the compiled
+        per-string path is faster here than exploding tokens into a long Series.
+        """
+        return series.map(str).map(self.preprocess)
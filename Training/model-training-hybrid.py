@@ -2,12 +2,16 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 import os
+import sys
+import time
+import joblib
 from sklearn.feature_extraction.text import HashingVectorizer
 from sklearn.preprocessing import LabelEncoder
 from sklearn.ensemble import VotingClassifier, RandomForestClassifier, GradientBoostingClassifier
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, roc_curve, auc, precision_score, recall_score, f1_score
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.preprocessing import StandardScaler
+from sklearn.base import clone
 import matplotlib.pyplot as plt
 import seaborn as sns
 
@@ -90,6 +94,60 @@ def generate_performance_visualization(y_true, y_pred, y_prob, save_path=None):
         'per_class_auc': roc_auc
     }
 
+def slim_model_info(model_info):
+    """Keep only what DDoSPredictor needs for inference.
+
+    Drops the standalone rf/gb models and the hashers of categorical columns
+    without any selected bucket. The voting classifier keeps its fitted
+    estimators_, while its estimators parameter (which still points at the
+    separately fitted rf/gb) is replaced by unfitted clones.
+    """
+    voting_clf = model_info['voting_classifier']
+    slim_voting_clf = clone(voting_clf)
+    slim_voting_clf.__dict__.update({
+        key: value for key, value in voting_clf.__dict__.items()
+        if key not in voting_clf.get_params(deep=False)
+    })
+
+    selected = set(model_info['selected_features'])
+    feature_info = {
+        col: info for col, info in model_info['feature_info'].items()
+        if selected.intersection(info['col_names'])
+    }
+
+    return {
+        'voting_classifier': slim_voting_clf,
+        'feature_info': feature_info,
+        'selected_features': model_info['selected_features'],
+        'label_encoder': model_info['label_encoder'],
+        'scaler_numerical': model_info['scaler_numerical'],
+        'scaler_features': model_info['scaler_features'],
+        'numerical_cols': model_info['numerical_cols']
+    }
+
+def export_deployment_artifact(model_info, path):
+    joblib.dump(slim_model_info(model_info), path, compress=0)
+
+def compare_artifacts(full_path, slim_path, repeats=3):
+    """Print the file size and best-of-`repeats` load time of both artifacts."""
+    print(f"\n{'Artifact':<30} {'Size (MB)':<12} {'Load (s)':<10}")
+    print("-" * 52)
+    for path in [full_path, slim_path]:
+        load_times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            joblib.load(path)
+            load_times.append(time.perf_counter() - start)
+        size_mb = os.path.getsize(path) / 1024 ** 2
+        print(f"{str(path):<30} {size_mb:<12.1f} {min(load_times):<10.3f}")
+
+# Export an existing model without retraining:
+#   python model-training-hybrid.py --export ddos_model.pkl ddos_model_slim.pkl
+if len(sys.argv) == 4 and sys.argv[1] == '--export':
+    export_deployment_artifact(joblib.load(sys.argv[2]), sys.argv[3])
+    compare_artifacts(sys.argv[2], sys.argv[3])
+    sys.exit(0)
+
 Path('data').mkdir(exist_ok=True)
 
 print("\n" + "="*80)
@@ -274,8 +332,6 @@ print(f"{'Gradient Boosting':<20} {gb_metrics['accuracy']:.3f} {gb_metrics['prec
 print(f"{'Voting Classifier':<20} {voting_metrics['accuracy']:.3f} {voting_metrics['precision']:.3f} {voting_metrics['recall']:.3f} {voting_metrics['f1']:.3f} {voting_metrics['auc_roc']:.3f}")
 print("-" * 50)
 
-import joblib
-
 model_info = {
     'voting_classifier': voting_clf,
     'rf': rf,
@@ -288,9 +344,15 @@ model_info = {
     'numerical_cols': numerical_cols
 }
 
-joblib.dump(model_info, 'ddos_model.pkl')
+# Uncompressed, so DDoSPredictor can load the numpy arrays with mmap_mode='r'
+joblib.dump(model_info, 'ddos_model.pkl', compress=0)
 print("\nModel saved as 'ddos_model.pkl'")
 
+export_deployment_artifact(model_info, 'ddos_model_slim.pkl')
+print("Deployment model saved as 'ddos_model_slim.pkl' "
+      "(copy it to ML/models/ddos/ddos_model.pkl to serve it)")
+compare_artifacts('ddos_model.pkl', 'ddos_model_slim.pkl')
+
 def predict_ddos(new_data_path):
     model_info = joblib.load('ddos_model.pkl')
     